@@ -0,0 +1,27 @@
+// Resolve dashboard data URLs through the content-hashed bundle manifest
+// written by scripts/build_data_bundle.py. Falls back to the raw file when
+// no bundle has been built or the file is not in the manifest.
+(function () {
+    const siteRoot = new URL('../', document.currentScript.src);
+    let manifestPromise = null;
+
+    function loadManifest() {
+        if (!manifestPromise) {
+            manifestPromise = fetch(new URL('data/bundle/manifest.json', siteRoot), { cache: 'no-cache' })
+                .then(response => response.ok ? response.json() : null)
+                .catch(() => null);
+        }
+        return manifestPromise;
+    }
+
+    window.dataUrl = async function (url) {
+        const manifest = await loadManifest();
+        if (!manifest || !manifest.files) return url;
+
+        const absolute = new URL(url, document.baseURI).href;
+        if (!absolute.startsWith(siteRoot.href)) return url;
+
+        const entry = manifest.files[absolute.slice(siteRoot.href.length)];
+        return entry ? new URL(entry.path, siteRoot).href : url;
+    };
+})();
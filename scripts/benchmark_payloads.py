@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Payload budget checks for the dashboard data assets.
+
+Finds every ``d3.csv``/``d3.json``/``fetch`` URL in the dashboard HTML pages,
+measures each asset's raw, gzip and brotli size and its Python-side parse
+time, totals them per page and compares the results against the budgets in
+``payload_budgets.json``. Runs offline against the repository tree and exits
+non-zero when a budget is exceeded, so payload growth is caught before
+deploy.
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from build_data_bundle import brotli, find_data_urls
+
+
+DEFAULT_BUDGETS = Path(__file__).with_name("payload_budgets.json")
+
+BUDGET_METRICS = ["raw_bytes", "gzip_bytes", "br_bytes", "parse_ms"]
+
+
+def parse_time_ms(content: bytes, suffix: str, repeats: int = 3) -> float:
+    """
+    Median time to parse an asset the way a page would consume it.
+
+    Args:
+        content: File contents
+        suffix: File extension (``.csv``, ``.json`` or ``.geojson``)
+        repeats: Number of timed parses
+
+    Returns:
+        Median parse time in milliseconds
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        text = content.decode("utf-8-sig")
+        if suffix == ".csv":
+            list(csv.DictReader(io.StringIO(text)))
+        else:
+            json.loads(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def measure_asset(path: Path, repeats: int = 3) -> Dict[str, Any]:
+    """
+    Measure one data asset.
+
+    Args:
+        path: Path to the asset
+        repeats: Number of timed parses
+
+    Returns:
+        Dictionary of sizes (bytes) and parse time (ms)
+    """
+    content = path.read_bytes()
+    result = {
+        "raw_bytes": len(content),
+        "gzip_bytes": len(gzip.compress(content, compresslevel=9, mtime=0)),
+        "parse_ms": round(parse_time_ms(content, path.suffix, repeats), 2),
+    }
+    if brotli is not None:
+        result["br_bytes"] = len(brotli.compress(content, quality=11))
+    return result
+
+
+def load_budgets(path: Path) -> Dict[str, Any]:
+    """Load budget configuration (``default_asset``, ``default_page``, ``pages``, ``assets``)."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def check_budget(measured: Dict[str, Any], budget: Dict[str, Any]) -> list:
+    """
+    Compare measurements against a budget.
+
+    Args:
+        measured: Measured metrics
+        budget: Limits keyed by metric name
+
+    Returns:
+        List of human-readable budget violations
+    """
+    failures = []
+    for metric in BUDGET_METRICS:
+        limit = budget.get(metric)
+        if limit is not None and metric in measured and measured[metric] > limit:
+            failures.append(f"{metric} {measured[metric]:,} > {limit:,}")
+    return failures
+
+
+def run_benchmark(repo_root: str = ".", budgets: Dict[str, Any] = None, repeats: int = 3) -> Dict[str, Any]:
+    """
+    Measure every dashboard's data payload and check it against budgets.
+
+    Args:
+        repo_root: Repository root
+        budgets: Budget configuration (no checks if None)
+        repeats: Number of timed parses per asset
+
+    Returns:
+        Report dictionary with per-asset and per-page results
+    """
+    repo_root = Path(repo_root)
+    budgets = budgets or {}
+    pages = find_data_urls(repo_root)
+
+    assets = {}
+    for urls in pages.values():
+        for _, relative in urls:
+            if relative in assets:
+                continue
+            path = repo_root / relative
+            if not path.exists():
+                assets[relative] = {"missing": True}
+                continue
+            measured = measure_asset(path, repeats)
+            budget = {**budgets.get("default_asset", {}), **budgets.get("assets", {}).get(relative, {})}
+            measured["failures"] = check_budget(measured, budget)
+            assets[relative] = measured
+
+    page_reports = {}
+    for page, urls in pages.items():
+        relatives = sorted({relative for _, relative in urls})
+        totals = {metric: 0 for metric in BUDGET_METRICS}
+        for relative in relatives:
+            for metric in BUDGET_METRICS:
+                totals[metric] += assets[relative].get(metric, 0)
+        totals["parse_ms"] = round(totals["parse_ms"], 2)
+        if brotli is None:
+            totals.pop("br_bytes")
+        budget = {**budgets.get("default_page", {}), **budgets.get("pages", {}).get(page, {})}
+        page_reports[page] = {
+            "assets": relatives,
+            "missing": [r for r in relatives if assets[r].get("missing")],
+            "totals": totals,
+            "failures": check_budget(totals, budget),
+        }
+
+    return {"assets": assets, "pages": page_reports}
+
+
+def print_report(report: Dict[str, Any]):
+    """Print per-page payload tables."""
+    for page, page_report in report["pages"].items():
+        print(f"\n{page}")
+        print("-" * 96)
+        print(f"{'asset':<60}{'raw':>10}{'gzip':>10}{'br':>10}{'parse ms':>10}")
+        for relative in page_report["assets"]:
+            asset = report["assets"][relative]
+            if asset.get("missing"):
+                print(f"{relative:<60}{'missing':>10}")
+                continue
+            print(f"{relative:<60}{asset['raw_bytes']:>10,}{asset['gzip_bytes']:>10,}"
+                  f"{asset.get('br_bytes', 0):>10,}{asset['parse_ms']:>10.1f}")
+            for failure in asset["failures"]:
+                print(f"    ✗ {failure}")
+        totals = page_report["totals"]
+        print(f"{'TOTAL':<60}{totals['raw_bytes']:>10,}{totals['gzip_bytes']:>10,}"
+              f"{totals.get('br_bytes', 0):>10,}{totals['parse_ms']:>10.1f}")
+        for failure in page_report["failures"]:
+            print(f"    ✗ page {failure}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Measure dashboard data payloads and check them against budgets"
+    )
+    parser.add_argument("--repo-root", type=str, default=".",
+                        help="Repository root (default: current directory)")
+    parser.add_argument("--budgets", type=str, default=str(DEFAULT_BUDGETS),
+                        help="Budget configuration JSON (default: scripts/payload_budgets.json)")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="Timed parses per asset (default: 3)")
+    parser.add_argument("--json", type=str, default=None,
+                        help="Optional path to write the full report as JSON")
+    parser.add_argument("--strict", action="store_true",
+                        help="Also fail when a referenced asset is missing")
+    args = parser.parse_args()
+
+    budgets = load_budgets(Path(args.budgets)) if args.budgets else {}
+    report = run_benchmark(args.repo_root, budgets, args.repeats)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved report to {args.json}")
+
+    failures = sum(len(a.get("failures", [])) for a in report["assets"].values())
+    failures += sum(len(p["failures"]) for p in report["pages"].values())
+    missing = sorted(r for r, a in report["assets"].items() if a.get("missing"))
+
+    print()
+    if missing:
+        print(f"⚠ {len(missing)} referenced assets missing: {', '.join(missing)}")
+    if failures or (args.strict and missing):
+        print(f"❌ {failures} budget violations")
+        sys.exit(1)
+    print("✅ All payloads within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Build a spatially validated UC -> district -> province containment index.
+
+The UC, district and province GeoJSON layers are separate files with no
+verified link between them, and the dashboards roll UC rows up using the
+DISTRICT/PROVINCE strings on each row. This script places a representative
+point of every UC (and of every district) into the parent layer with a single
+bulk ``STRtree.query`` call and records the result as integer parent-ID
+arrays. Rollups can then use ``np.bincount`` on the parent IDs instead of
+string grouping, and rows whose names disagree with the geometry are flagged.
+"""
+
+import argparse
+import glob
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+
+GEOJSON_DIR = "data/geo/geojson"
+DEFAULT_OUTPUT = "data/geo/hierarchy/admin_hierarchy.json"
+
+
+def load_layers(geojson_dir: str):
+    """
+    Load the UC, district and province layers.
+
+    Args:
+        geojson_dir: Directory holding the boundary GeoJSON files
+
+    Returns:
+        Tuple of (uc_gdf, district_gdf, province_gdf)
+    """
+    geojson_dir = Path(geojson_dir)
+    uc_files = sorted(glob.glob(str(geojson_dir / "union_councils_*.geojson")))
+    if not uc_files:
+        raise FileNotFoundError(f"No union_councils_*.geojson files in {geojson_dir}")
+
+    ucs = pd.concat([gpd.read_file(f) for f in uc_files], ignore_index=True)
+    ucs = gpd.GeoDataFrame(ucs, geometry="geometry", crs="EPSG:4326")
+    districts = gpd.read_file(geojson_dir / "districts.geojson")
+    provinces = gpd.read_file(geojson_dir / "provinces.geojson")
+
+    print(f"Loaded {len(ucs)} UC features, {len(districts)} districts, {len(provinces)} provinces")
+    return ucs, districts, provinces
+
+
+def assign_parents(children: np.ndarray, parents: np.ndarray) -> np.ndarray:
+    """
+    Find the containing parent polygon for each child geometry.
+
+    A representative point of every child is queried against an STRtree of
+    the parents in one vectorized call. Children whose point falls in no
+    parent get -1; if a point falls on a shared boundary the lowest parent
+    index wins.
+
+    Args:
+        children: Array of child shapely geometries
+        parents: Array of parent shapely geometries
+
+    Returns:
+        Integer array of parent indices, one per child
+    """
+    points = shapely.point_on_surface(children)
+    tree = shapely.STRtree(parents)
+    child_idx, parent_idx = tree.query(points, predicate="within")
+
+    # Keep the lowest parent index for children matched more than once
+    order = np.lexsort((parent_idx, child_idx))
+    child_idx, parent_idx = child_idx[order], parent_idx[order]
+    unique_children, first = np.unique(child_idx, return_index=True)
+
+    parent_ids = np.full(len(children), -1, dtype=np.int32)
+    parent_ids[unique_children] = parent_idx[first]
+    return parent_ids
+
+
+def build_hierarchy(ucs, districts, provinces) -> Dict[str, Any]:
+    """
+    Build the containment index and flag attribute mismatches.
+
+    Args:
+        ucs: UC GeoDataFrame
+        districts: District GeoDataFrame
+        provinces: Province GeoDataFrame
+
+    Returns:
+        Dictionary of name tables, parent-ID arrays and flagged UCs
+    """
+    uc_district = assign_parents(ucs.geometry.values, districts.geometry.values)
+    district_province = assign_parents(districts.geometry.values, provinces.geometry.values)
+    uc_province = np.where(uc_district >= 0, district_province[uc_district], -1)
+
+    district_names = districts["DISTRICT"].to_numpy(dtype=object)
+    province_names = provinces["PROVINCE"].to_numpy(dtype=object)
+
+    # Compare the spatial parents against the names carried on each UC
+    spatial_district = np.where(uc_district >= 0, district_names[uc_district], None)
+    spatial_province = np.where(uc_province >= 0, province_names[uc_province], None)
+    no_parent = uc_district < 0
+    district_mismatch = ~no_parent & (spatial_district != ucs["DISTRICT"].to_numpy(dtype=object))
+    province_mismatch = ~no_parent & (spatial_province != ucs["PROVINCE"].to_numpy(dtype=object))
+
+    flagged = []
+    for i in np.flatnonzero(no_parent | district_mismatch | province_mismatch):
+        flagged.append({
+            "index": int(i),
+            "uc_id": int(ucs["UC_C"].iat[i]),
+            "uc_name": ucs["uc_name"].iat[i],
+            "DISTRICT": ucs["DISTRICT"].iat[i],
+            "PROVINCE": ucs["PROVINCE"].iat[i],
+            "spatial_district": spatial_district[i],
+            "spatial_province": spatial_province[i],
+            "reason": "no_parent" if no_parent[i] else (
+                "district_mismatch" if district_mismatch[i] else "province_mismatch"
+            ),
+        })
+
+    print(f"UCs without a containing district: {int(no_parent.sum())}")
+    print(f"UCs with mismatched DISTRICT: {int(district_mismatch.sum())}")
+    print(f"UCs with mismatched PROVINCE: {int(province_mismatch.sum())}")
+
+    return {
+        "provinces": province_names.tolist(),
+        "districts": district_names.tolist(),
+        "district_province": district_province.tolist(),
+        "uc_ids": ucs["UC_C"].astype(int).tolist(),
+        "uc_district": uc_district.tolist(),
+        "uc_province": uc_province.tolist(),
+        "flagged": flagged,
+    }
+
+
+def load_hierarchy(path: str = DEFAULT_OUTPUT) -> Dict[str, Any]:
+    """
+    Load a hierarchy file with parent IDs as NumPy arrays.
+
+    Args:
+        path: Path to the hierarchy JSON written by this script
+
+    Returns:
+        Dictionary with the same keys as the file, arrays as ``np.ndarray``
+    """
+    with open(path) as f:
+        hierarchy = json.load(f)
+    for key in ("district_province", "uc_ids", "uc_district", "uc_province"):
+        hierarchy[key] = np.asarray(hierarchy[key], dtype=np.int64)
+    return hierarchy
+
+
+def uc_parent_lookup(hierarchy: Dict[str, Any], uc_codes) -> np.ndarray:
+    """
+    Map UC codes (the ``uc`` column in the monthly data) to feature indices.
+
+    Multi-part UCs appear once per part in the boundary files; the first part
+    is used. Unknown codes map to -1.
+
+    Args:
+        hierarchy: Hierarchy loaded with ``load_hierarchy``
+        uc_codes: Array-like of integer UC codes
+
+    Returns:
+        Integer array of UC feature indices
+    """
+    uc_ids = hierarchy["uc_ids"]
+    order = np.argsort(uc_ids, kind="stable")
+    sorted_ids = uc_ids[order]
+    codes = np.asarray(uc_codes, dtype=np.int64)
+    pos = np.searchsorted(sorted_ids, codes)
+    pos_clipped = np.minimum(pos, len(sorted_ids) - 1)
+    found = sorted_ids[pos_clipped] == codes
+    return np.where(found, order[pos_clipped], -1)
+
+
+def rollup(values, parent_ids: np.ndarray, size: int) -> np.ndarray:
+    """
+    Sum values into parent buckets with ``np.bincount``.
+
+    Args:
+        values: Values to aggregate, one per child
+        parent_ids: Integer parent index per child (-1 entries are dropped)
+        size: Number of parents
+
+    Returns:
+        Array of per-parent sums
+    """
+    values = np.asarray(values, dtype=np.float64)
+    keep = parent_ids >= 0
+    return np.bincount(parent_ids[keep], weights=values[keep], minlength=size)
+
+
+def check_rows(df: pd.DataFrame, hierarchy: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Flag monthly data rows whose UC or admin names disagree with the index.
+
+    Args:
+        df: Monthly UC data with ``uc``, ``DISTRICT`` and ``PROVINCE`` columns
+        hierarchy: Hierarchy loaded with ``load_hierarchy``
+
+    Returns:
+        DataFrame of flagged rows (original index kept) with a ``reason`` column
+    """
+    uc_index = uc_parent_lookup(hierarchy, df["uc"].to_numpy())
+    known = uc_index >= 0
+    district_ids = np.where(known, hierarchy["uc_district"][uc_index], -1)
+    province_ids = np.where(known, hierarchy["uc_province"][uc_index], -1)
+
+    districts = np.asarray(hierarchy["districts"] + [None], dtype=object)
+    provinces = np.asarray(hierarchy["provinces"] + [None], dtype=object)
+
+    reason = np.full(len(df), "", dtype=object)
+    reason[known & (provinces[province_ids] != df["PROVINCE"].to_numpy(dtype=object))] = "province_mismatch"
+    reason[known & (districts[district_ids] != df["DISTRICT"].to_numpy(dtype=object))] = "district_mismatch"
+    reason[~known] = "unknown_uc"
+
+    flagged = df.loc[reason != "", ["month", "uc", "PROVINCE", "DISTRICT"]].copy()
+    flagged["reason"] = reason[reason != ""]
+    return flagged
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Build the UC -> district -> province containment index"
+    )
+    parser.add_argument(
+        "--geojson-dir",
+        type=str,
+        default=GEOJSON_DIR,
+        help=f"Directory with boundary GeoJSON files (default: {GEOJSON_DIR})",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=DEFAULT_OUTPUT,
+        help=f"Output hierarchy JSON (default: {DEFAULT_OUTPUT})",
+    )
+    parser.add_argument(
+        "--check",
+        type=str,
+        default=None,
+        help="Optional monthly UC CSV to check against the index",
+    )
+    args = parser.parse_args()
+
+    ucs, districts, provinces = load_layers(args.geojson_dir)
+    hierarchy = build_hierarchy(ucs, districts, provinces)
+
+    output_file = Path(args.output)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w") as f:
+        json.dump(hierarchy, f, separators=(",", ":"))
+    print(f"Saved hierarchy to {output_file}")
+
+    if args.check:
+        df = pd.read_csv(args.check, usecols=["month", "uc", "PROVINCE", "DISTRICT"])
+        flagged = check_rows(df, load_hierarchy(output_file))
+        print(f"\nChecked {len(df)} rows from {args.check}: {len(flagged)} flagged")
+        if len(flagged):
+            print(flagged["reason"].value_counts().to_string())
+            print(flagged.head(10).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Build an area-weighted UC -> political constituency crosswalk.
+
+Every UC polygon is intersected with the constituencies it touches: an
+STRtree over the constituencies supplies candidate pairs in one bulk query,
+and the intersection areas for all pairs are computed with vectorized
+shapely calls, one worker process per province file. The result is a sparse
+matrix in CSR form with one row per constituency and one column per UC code,
+where entry (c, u) is the share of UC u's area inside constituency c.
+Where overlapping constituency polygons cover more than a UC's full area,
+that UC's column is rescaled to sum to 1 so reallocation conserves totals.
+
+Reallocating any UC-level total (units received, tax collected, ...) to
+constituencies is then a single sparse matrix-vector product::
+
+    crosswalk = load_crosswalk()
+    by_constituency = reallocate(crosswalk, uc_values)
+
+Areas are measured in degrees; only ratios within a UC are used, so the
+projection distortion cancels out at UC scale.
+"""
+
+import argparse
+import glob
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from scipy import sparse
+
+
+GEOJSON_DIR = "data/geo/geojson"
+DEFAULT_OUTPUT = "data/geo/crosswalk/uc_constituency_crosswalk.npz"
+
+
+def _load_constituencies(geojson_dir: str) -> gpd.GeoDataFrame:
+    """Load constituency polygons, repairing invalid geometries."""
+    constituencies = gpd.read_file(Path(geojson_dir) / "political_constituencies.geojson")
+    constituencies["geometry"] = shapely.make_valid(constituencies.geometry.values)
+    return constituencies
+
+
+def intersect_province(args: Tuple[str, str]) -> Dict[str, np.ndarray]:
+    """
+    Intersect the UCs of one province file with all constituencies.
+
+    Args:
+        args: Tuple of (UC GeoJSON path, directory with the constituency file)
+
+    Returns:
+        Dictionary with UC codes and areas per feature, and the candidate
+        pairs (feature index, constituency index, intersection area)
+    """
+    uc_path, geojson_dir = args
+    ucs = gpd.read_file(uc_path)
+    uc_geoms = shapely.make_valid(ucs.geometry.values)
+    con_geoms = _load_constituencies(geojson_dir).geometry.values
+
+    tree = shapely.STRtree(con_geoms)
+    uc_idx, con_idx = tree.query(uc_geoms, predicate="intersects")
+
+    areas = shapely.area(shapely.intersection(uc_geoms[uc_idx], con_geoms[con_idx]))
+    keep = areas > 0
+
+    return {
+        "uc_codes": ucs["UC_C"].to_numpy(dtype=np.int64),
+        "uc_areas": shapely.area(uc_geoms),
+        "uc_idx": uc_idx[keep],
+        "con_idx": con_idx[keep],
+        "areas": areas[keep],
+    }
+
+
+def build_crosswalk(geojson_dir: str = GEOJSON_DIR, workers: int = None) -> Dict[str, Any]:
+    """
+    Build the constituency x UC area-weight matrix.
+
+    Args:
+        geojson_dir: Directory holding the boundary GeoJSON files
+        workers: Worker processes (default: one per province file)
+
+    Returns:
+        Dictionary with the CSR ``matrix``, ``uc_ids`` (column order) and
+        ``constituencies`` (row order) plus per-UC ``coverage`` (share of
+        the UC's area inside constituencies, before rescaling)
+    """
+    uc_files = sorted(glob.glob(str(Path(geojson_dir) / "union_councils_*.geojson")))
+    if not uc_files:
+        raise FileNotFoundError(f"No union_councils_*.geojson files in {geojson_dir}")
+
+    tasks = [(path, geojson_dir) for path in uc_files]
+    with ProcessPoolExecutor(max_workers=workers or len(tasks)) as pool:
+        parts = list(pool.map(intersect_province, tasks))
+
+    constituencies = _load_constituencies(geojson_dir)
+
+    # Multi-part UCs appear as several features; merge them by UC code
+    all_codes = np.concatenate([part["uc_codes"] for part in parts])
+    uc_ids, feature_col = np.unique(all_codes, return_inverse=True)
+    uc_area = np.bincount(feature_col, weights=np.concatenate([part["uc_areas"] for part in parts]),
+                          minlength=len(uc_ids))
+
+    rows, cols, areas = [], [], []
+    feature_offset = 0
+    for part in parts:
+        rows.append(part["con_idx"])
+        cols.append(feature_col[feature_offset + part["uc_idx"]])
+        areas.append(part["areas"])
+        feature_offset += len(part["uc_codes"])
+    rows, cols, areas = np.concatenate(rows), np.concatenate(cols), np.concatenate(areas)
+
+    # Duplicate (constituency, UC) pairs from multi-part UCs are summed here
+    weights = areas / uc_area[cols]
+    matrix = sparse.csr_matrix(
+        (weights, (rows, cols)), shape=(len(constituencies), len(uc_ids))
+    )
+    coverage = np.asarray(matrix.sum(axis=0)).ravel()
+
+    # Overlapping constituencies would otherwise count part of a UC twice
+    scale = np.where(coverage > 1, 1 / np.maximum(coverage, 1), 1.0)
+    matrix = matrix @ sparse.diags(scale)
+    matrix = matrix.tocsr()
+
+    return {
+        "matrix": matrix,
+        "uc_ids": uc_ids,
+        "constituencies": constituencies["NA_Cons"].astype(str).to_numpy(),
+        "coverage": coverage,
+    }
+
+
+def save_crosswalk(crosswalk: Dict[str, Any], path: str):
+    """
+    Save the crosswalk as a compressed ``.npz`` of CSR arrays.
+
+    Args:
+        crosswalk: Result of ``build_crosswalk``
+        path: Output ``.npz`` path
+    """
+    matrix = crosswalk["matrix"]
+    output_file = Path(path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(
+        output_file,
+        data=matrix.data.astype(np.float32),
+        indices=matrix.indices.astype(np.int32),
+        indptr=matrix.indptr.astype(np.int64),
+        shape=np.asarray(matrix.shape),
+        uc_ids=crosswalk["uc_ids"],
+        constituencies=np.asarray(crosswalk["constituencies"], dtype=str),
+    )
+
+
+def save_crosswalk_json(crosswalk: Dict[str, Any], path: str):
+    """
+    Save the CSR arrays as compact JSON for the dashboards.
+
+    Args:
+        crosswalk: Result of ``build_crosswalk``
+        path: Output ``.json`` path
+    """
+    matrix = crosswalk["matrix"]
+    output_file = Path(path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w") as f:
+        json.dump({
+            "shape": list(matrix.shape),
+            "indptr": matrix.indptr.tolist(),
+            "indices": matrix.indices.tolist(),
+            "data": np.round(matrix.data, 6).tolist(),
+            "uc_ids": crosswalk["uc_ids"].tolist(),
+            "constituencies": crosswalk["constituencies"].tolist(),
+        }, f, separators=(",", ":"))
+
+
+def load_crosswalk(path: str = DEFAULT_OUTPUT) -> Dict[str, Any]:
+    """
+    Load a crosswalk written by ``save_crosswalk``.
+
+    Args:
+        path: Path to the ``.npz`` file
+
+    Returns:
+        Dictionary with the CSR ``matrix``, ``uc_ids`` and ``constituencies``
+    """
+    with np.load(path, allow_pickle=False) as f:
+        matrix = sparse.csr_matrix(
+            (f["data"].astype(np.float64), f["indices"], f["indptr"]), shape=tuple(f["shape"])
+        )
+        return {
+            "matrix": matrix,
+            "uc_ids": f["uc_ids"],
+            "constituencies": f["constituencies"],
+        }
+
+
+def align_uc_values(crosswalk: Dict[str, Any], uc_codes, values) -> np.ndarray:
+    """
+    Sum values by UC code into the crosswalk's column order.
+
+    Args:
+        crosswalk: Loaded crosswalk
+        uc_codes: UC code per value (e.g. the ``uc`` column of the monthly data)
+        values: Values to align
+
+    Returns:
+        Dense vector with one entry per crosswalk UC (unknown codes dropped)
+    """
+    uc_ids = crosswalk["uc_ids"]
+    codes = np.asarray(uc_codes, dtype=np.int64)
+    pos = np.searchsorted(uc_ids, codes)
+    pos_clipped = np.minimum(pos, len(uc_ids) - 1)
+    found = uc_ids[pos_clipped] == codes
+    return np.bincount(pos_clipped[found], weights=np.asarray(values, dtype=np.float64)[found],
+                       minlength=len(uc_ids))
+
+
+def reallocate(crosswalk: Dict[str, Any], uc_values) -> np.ndarray:
+    """
+    Reallocate UC-level totals to constituencies by area share.
+
+    Args:
+        crosswalk: Loaded crosswalk
+        uc_values: Vector aligned with ``crosswalk["uc_ids"]``
+
+    Returns:
+        Vector aligned with ``crosswalk["constituencies"]``
+    """
+    return crosswalk["matrix"] @ np.asarray(uc_values, dtype=np.float64)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Build the area-weighted UC -> political constituency crosswalk"
+    )
+    parser.add_argument("--geojson-dir", type=str, default=GEOJSON_DIR,
+                        help=f"Directory with boundary GeoJSON files (default: {GEOJSON_DIR})")
+    parser.add_argument("--output", type=str, default=DEFAULT_OUTPUT,
+                        help=f"Output .npz file (default: {DEFAULT_OUTPUT})")
+    parser.add_argument("--json", type=str, default=None,
+                        help="Optional JSON copy of the CSR arrays for the dashboards")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: one per province file)")
+    parser.add_argument("--check", type=str, default=None,
+                        help="Optional monthly UC CSV to reallocate as a demonstration")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    crosswalk = build_crosswalk(args.geojson_dir, args.workers)
+    matrix = crosswalk["matrix"]
+    print(f"Built {matrix.shape[0]} x {matrix.shape[1]} crosswalk with {matrix.nnz} non-zeros "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    partial = crosswalk["coverage"] < 0.99
+    print(f"UCs with < 99% of their area inside constituencies: {int(partial.sum())}")
+    over = crosswalk["coverage"] > 1.001
+    print(f"UCs covered > 100.1% by overlapping constituencies (rescaled to 100%): {int(over.sum())}"
+          + (f", max {crosswalk['coverage'].max():.1%}" if over.any() else ""))
+
+    save_crosswalk(crosswalk, args.output)
+    print(f"Saved crosswalk to {args.output}")
+    if args.json:
+        save_crosswalk_json(crosswalk, args.json)
+        print(f"Saved JSON crosswalk to {args.json}")
+
+    if args.check:
+        df = pd.read_csv(args.check, usecols=["uc", "mth_unit_recieved_dummy"])
+        loaded = load_crosswalk(args.output)
+        uc_values = align_uc_values(loaded, df["uc"], df["mth_unit_recieved_dummy"])
+        start = time.perf_counter()
+        by_constituency = reallocate(loaded, uc_values)
+        elapsed = (time.perf_counter() - start) * 1000
+        top = np.argsort(by_constituency)[::-1][:5]
+        print(f"\nReallocated units received to constituencies in {elapsed:.2f} ms "
+              f"({by_constituency.sum():,.0f} of {uc_values.sum():,.0f} units)")
+        for idx in top:
+            print(f"  {loaded['constituencies'][idx]}: {by_constituency[idx]:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Build a precompressed, content-hashed bundle of the dashboard data files.
+
+Every CSV/GeoJSON file the dashboards fetch (found by scanning the
+``d3.csv``/``d3.json``/``fetch`` calls in the HTML pages) is minified
+(compact JSON with rounded coordinates, unused CSV columns dropped), written
+under ``data/bundle/`` with a content hash in its name, and given ``.gz`` and
+``.br`` siblings. ``data/bundle/manifest.json`` maps each original path to
+its hashed file; ``js/data_manifest.js`` uses it to resolve URLs in the
+pages, falling back to the raw files when no bundle has been built.
+
+Hashed files never change content, so they can be served with
+``Cache-Control: public, max-age=31536000, immutable``; only the manifest
+needs revalidation. Brotli output requires the ``brotli`` package and is
+skipped if it is not installed.
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+PAGE_GLOBS = ["index.html", "pages/**/*.html"]
+BUNDLE_DIR = "data/bundle"
+MANIFEST_NAME = "manifest.json"
+
+# Matches d3.csv('...'), d3.json('...') and fetch('...'), with or without
+# the dataUrl(...) wrapper from js/data_manifest.js
+DATA_URL_PATTERN = re.compile(
+    r"""(?:d3\.(?:csv|json)|fetch)\(\s*(?:await\s+dataUrl\(\s*)?['"]([^'"]+\.(?:csv|geojson|json))['"]"""
+)
+
+# Files a bundle build may have written: <stem>.<10-hex hash>.<ext>[.gz|.br]
+HASHED_NAME_PATTERN = re.compile(r"\.[0-9a-f]{10}\.(?:csv|geojson|json)(?:\.gz|\.br)?$")
+
+# Decimal places kept for GeoJSON coordinates (~0.1 m)
+COORDINATE_PRECISION = 6
+
+# Per-file CSV column trimming (columns the dashboards never read)
+CSV_DROP_COLUMNS = {
+    "data/dummy/dummy_data.csv": ["geometry"],
+}
+CSV_KEEP_COLUMNS = {
+    "data/generation/nepra_generation.csv": [
+        "Observation Date",
+        "Observation Value",
+        "Series name",
+    ],
+}
+
+
+def find_data_urls(repo_root: Path) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Find the data URLs each dashboard page loads.
+
+    Args:
+        repo_root: Repository root
+
+    Returns:
+        Dictionary mapping page path to a list of (url, repo-relative asset path)
+    """
+    pages = {}
+    for pattern in PAGE_GLOBS:
+        for page in sorted(repo_root.glob(pattern)):
+            text = page.read_text(encoding="utf-8")
+            urls = []
+            for url in DATA_URL_PATTERN.findall(text):
+                asset = (page.parent / url).resolve()
+                try:
+                    relative = asset.relative_to(repo_root.resolve()).as_posix()
+                except ValueError:
+                    continue
+                if (url, relative) not in urls:
+                    urls.append((url, relative))
+            if urls:
+                pages[page.relative_to(repo_root).as_posix()] = urls
+    return pages
+
+
+def _round_coordinates(value: Any) -> Any:
+    """Round nested coordinate arrays."""
+    if isinstance(value, list):
+        return [_round_coordinates(item) for item in value]
+    if isinstance(value, float):
+        return round(value, COORDINATE_PRECISION)
+    return value
+
+
+def _round_geometry(geometry: Dict[str, Any]):
+    """Round the coordinates of a GeoJSON geometry in place."""
+    if not geometry:
+        return
+    if geometry.get("type") == "GeometryCollection":
+        for child in geometry.get("geometries", []):
+            _round_geometry(child)
+    elif "coordinates" in geometry:
+        geometry["coordinates"] = _round_coordinates(geometry["coordinates"])
+
+
+def minify_json(raw: bytes) -> bytes:
+    """
+    Re-encode JSON/GeoJSON compactly with rounded coordinates.
+
+    Args:
+        raw: Original file contents
+
+    Returns:
+        Minified UTF-8 bytes
+    """
+    data = json.loads(raw)
+    if isinstance(data, dict) and data.get("type") == "FeatureCollection":
+        for feature in data.get("features", []):
+            _round_geometry(feature.get("geometry"))
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def minify_csv(raw: bytes, relative_path: str) -> bytes:
+    """
+    Drop unused columns from a CSV and normalise its encoding.
+
+    Fully quoted inputs stay fully quoted, since some pages parse them with
+    a quote-aware regex rather than a CSV parser.
+
+    Args:
+        raw: Original file contents
+        relative_path: Repo-relative path, used to look up column trimming
+
+    Returns:
+        Minified UTF-8 bytes
+    """
+    text = raw.decode("utf-8-sig")
+    rows = list(csv.reader(io.StringIO(text)))
+    if not rows:
+        return raw
+
+    header = rows[0]
+    if relative_path in CSV_KEEP_COLUMNS:
+        keep = [i for i, name in enumerate(header) if name in CSV_KEEP_COLUMNS[relative_path]]
+    else:
+        drop = set(CSV_DROP_COLUMNS.get(relative_path, []))
+        keep = [i for i, name in enumerate(header) if name not in drop]
+
+    quoting = csv.QUOTE_ALL if text.startswith('"') else csv.QUOTE_MINIMAL
+    out = io.StringIO()
+    writer = csv.writer(out, quoting=quoting, lineterminator="\n")
+    for row in rows:
+        if row:
+            writer.writerow([row[i] if i < len(row) else "" for i in keep])
+    return out.getvalue().encode("utf-8")
+
+
+def minify(path: Path, relative_path: str) -> bytes:
+    """Minify a data file according to its type."""
+    raw = path.read_bytes()
+    if path.suffix in (".json", ".geojson"):
+        return minify_json(raw)
+    if path.suffix == ".csv":
+        return minify_csv(raw, relative_path)
+    return raw
+
+
+def hashed_name(relative_path: str, content: bytes) -> str:
+    """
+    Bundle path for a minified asset, e.g. ``geo/geojson/districts.1a2b3c4d5e.geojson``.
+
+    Args:
+        relative_path: Repo-relative path of the source file
+        content: Minified contents
+
+    Returns:
+        Path relative to the bundle directory
+    """
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    path = Path(relative_path)
+    parent = Path(*path.parts[1:-1]) if path.parts[0] == "data" else path.parent
+    return (parent / f"{path.stem}.{digest}{path.suffix}").as_posix()
+
+
+def _previous_bundle_files(repo_root: Path, bundle_root: Path) -> set:
+    """Resolved paths of the files listed in an existing manifest (with .gz/.br siblings)."""
+    manifest_path = bundle_root / MANIFEST_NAME
+    if not manifest_path.exists():
+        return set()
+    try:
+        files = json.loads(manifest_path.read_text(encoding="utf-8")).get("files", {})
+    except ValueError:
+        return set()
+    previous = set()
+    for entry in files.values():
+        path = (repo_root / entry["path"]).resolve()
+        previous.update({path, path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")})
+    return previous
+
+
+def build_bundle(repo_root: str = ".", bundle_dir: str = BUNDLE_DIR) -> Dict[str, Any]:
+    """
+    Minify, hash and precompress every data asset the dashboards fetch.
+
+    Args:
+        repo_root: Repository root
+        bundle_dir: Output directory, relative to the repository root
+
+    Returns:
+        The manifest dictionary that was written
+    """
+    repo_root = Path(repo_root)
+    bundle_root = repo_root / bundle_dir
+    bundle_root.mkdir(parents=True, exist_ok=True)
+    previous = _previous_bundle_files(repo_root, bundle_root)
+
+    assets = sorted({
+        relative
+        for urls in find_data_urls(repo_root).values()
+        for _, relative in urls
+    })
+
+    files = {}
+    written = set()
+    for relative in assets:
+        source = repo_root / relative
+        if not source.exists():
+            print(f"  ⚠ {relative} not found, pages will fetch it unbundled")
+            continue
+
+        content = minify(source, relative)
+        name = hashed_name(relative, content)
+        target = bundle_root / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        written.add(target)
+
+        entry = {
+            "path": f"{bundle_dir}/{name}",
+            "source_bytes": source.stat().st_size,
+            "bytes": len(content),
+        }
+
+        gz_target = target.with_name(target.name + ".gz")
+        gz_target.write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+        written.add(gz_target)
+        entry["gzip_bytes"] = gz_target.stat().st_size
+
+        if brotli is not None:
+            br_target = target.with_name(target.name + ".br")
+            br_target.write_bytes(brotli.compress(content, quality=11))
+            written.add(br_target)
+            entry["br_bytes"] = br_target.stat().st_size
+
+        files[relative] = entry
+        print(f"  {relative}: {entry['source_bytes']:,} -> {entry['bytes']:,} bytes "
+              f"(gzip {entry['gzip_bytes']:,}"
+              + (f", br {entry['br_bytes']:,})" if "br_bytes" in entry else ")"))
+
+    # Remove hashed files left over from earlier builds; anything else in the
+    # bundle directory (e.g. source data, if pointed at data/) is left alone
+    manifest_path = bundle_root / MANIFEST_NAME
+    for stale in bundle_root.rglob("*"):
+        if not stale.is_file() or stale in written or stale == manifest_path:
+            continue
+        if HASHED_NAME_PATTERN.search(stale.name) or stale.resolve() in previous:
+            stale.unlink()
+
+    manifest = {"version": 1, "files": files}
+    manifest_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    return manifest
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Build the precompressed, content-hashed dashboard data bundle"
+    )
+    parser.add_argument(
+        "--repo-root",
+        type=str,
+        default=".",
+        help="Repository root (default: current directory)",
+    )
+    parser.add_argument(
+        "--bundle-dir",
+        type=str,
+        default=BUNDLE_DIR,
+        help=f"Output directory relative to the repository root (default: {BUNDLE_DIR})",
+    )
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("brotli is not installed; skipping .br output")
+
+    print(f"Building data bundle in {args.bundle_dir}...")
+    manifest = build_bundle(args.repo_root, args.bundle_dir)
+
+    files = manifest["files"].values()
+    source = sum(entry["source_bytes"] for entry in files)
+    gzipped = sum(entry["gzip_bytes"] for entry in files)
+    print(f"\n✅ Bundled {len(manifest['files'])} files: {source:,} bytes raw -> {gzipped:,} bytes gzip")
+    print(f"📁 Manifest: {args.bundle_dir}/{MANIFEST_NAME}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Build a zoom-level clustering index for the feeder map markers.
+
+Feeder points are projected to Web Mercator and clustered on a grid whose
+cells are ``--radius`` screen pixels wide at each zoom. The hierarchy is built
+bottom-up: clusters at zoom ``z`` are formed from the clusters at ``z + 1``,
+so every feeder belongs to exactly one cluster per zoom and aggregates are
+combined rather than recomputed from raw points. Each cluster carries the
+feeder count, total consumers, mean ``td_loss_percent`` and the worst
+``maintenance_status``.
+
+Clusters are written as one GeoJSON file per map tile
+(``<output>/<z>/<x>/<y>.geojson``) plus an ``index.json`` listing the tiles
+per zoom, so a map only fetches the tiles in view and draws at most a few
+hundred clusters per tile.
+"""
+
+import argparse
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from data_loader import load_csv
+
+
+DEFAULT_INPUT = "data/dummy/feeder_data.csv"
+DEFAULT_OUTPUT = "data/geo/feeder_clusters"
+
+# Ordered best -> worst; unknown statuses rank below Good
+MAINTENANCE_ORDER = ["Good", "Fair", "Poor"]
+
+TILE_SIZE = 256
+
+
+def load_feeder_points(path: str) -> pd.DataFrame:
+    """
+    Load feeder locations and the attributes that are aggregated.
+
+    Accepts the feeder CSV (``lat``/``lon`` or ``coordinates_lat``/
+    ``coordinates_lon`` columns) or a feeder GeoJSON of points or lines;
+    lines are placed at their first vertex, as on the dashboard.
+
+    Args:
+        path: Feeder CSV or GeoJSON file
+
+    Returns:
+        DataFrame with feeder_id, lon, lat, consumers, td_loss_percent and
+        maintenance_status
+    """
+    if Path(path).suffix in (".geojson", ".json"):
+        import geopandas as gpd
+        import shapely
+
+        gdf = gpd.read_file(path)
+        geoms = gdf.geometry.values
+        is_point = shapely.get_type_id(geoms) == 0
+        points = np.where(is_point, geoms, shapely.get_point(geoms, 0))
+        df = pd.DataFrame(gdf.drop(columns="geometry"))
+        df["lon"] = shapely.get_x(points)
+        df["lat"] = shapely.get_y(points)
+    else:
+        df = load_csv(path)
+        df = df.rename(columns={"coordinates_lat": "lat", "coordinates_lon": "lon"})
+
+    missing = {"feeder_id", "lat", "lon"} - set(df.columns)
+    if missing:
+        raise ValueError(f"{path} is missing columns: {sorted(missing)}")
+
+    df = df.dropna(subset=["lat", "lon"]).reset_index(drop=True)
+    return pd.DataFrame({
+        "feeder_id": df["feeder_id"].astype(str),
+        "lon": df["lon"].astype(np.float64),
+        "lat": df["lat"].astype(np.float64),
+        "consumers": pd.to_numeric(df.get("consumers", 0), errors="coerce").fillna(0),
+        "td_loss_percent": pd.to_numeric(df.get("td_loss_percent", np.nan), errors="coerce"),
+        "maintenance_status": df.get("maintenance_status", pd.Series("Unknown", index=df.index)),
+    })
+
+
+def project(lon: np.ndarray, lat: np.ndarray):
+    """Project lon/lat to Web Mercator world coordinates in [0, 1)."""
+    lat = np.clip(lat, -85.0511, 85.0511)
+    x = (lon + 180) / 360
+    sin = np.sin(np.radians(lat))
+    y = 0.5 - np.log((1 + sin) / (1 - sin)) / (4 * np.pi)
+    return np.clip(x, 0, 1 - 1e-12), np.clip(y, 0, 1 - 1e-12)
+
+
+def unproject(x: np.ndarray, y: np.ndarray):
+    """Inverse of ``project``."""
+    lon = x * 360 - 180
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y))))
+    return lon, lat
+
+
+def _leaf_level(points: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """One cluster per feeder, holding the sums that later levels combine."""
+    x, y = project(points["lon"].to_numpy(), points["lat"].to_numpy())
+    loss = points["td_loss_percent"].to_numpy(dtype=np.float64)
+    rank = pd.Categorical(points["maintenance_status"], categories=MAINTENANCE_ORDER).codes
+    return {
+        "x_sum": x,
+        "y_sum": y,
+        "count": np.ones(len(points)),
+        "consumers": points["consumers"].to_numpy(dtype=np.float64),
+        "loss_sum": np.nan_to_num(loss),
+        "loss_count": (~np.isnan(loss)).astype(np.float64),
+        "worst": rank.astype(np.int64),
+        "first": np.arange(len(points)),
+    }
+
+
+def cluster_level(child: Dict[str, np.ndarray], zoom: int, radius: int) -> Dict[str, np.ndarray]:
+    """
+    Merge the clusters of the next zoom in into grid cells at ``zoom``.
+
+    Args:
+        child: Cluster arrays of zoom ``zoom + 1`` (or the leaf level)
+        zoom: Zoom level being built
+        radius: Grid cell size in screen pixels
+
+    Returns:
+        Cluster arrays for this zoom, plus ``parent`` mapping each child
+        cluster to its cluster here
+    """
+    cells = TILE_SIZE * 2 ** zoom / radius
+    cx = np.floor(child["x_sum"] / child["count"] * cells).astype(np.int64)
+    cy = np.floor(child["y_sum"] / child["count"] * cells).astype(np.int64)
+    _, first, parent = np.unique(cx * (int(cells) + 1) + cy, return_index=True, return_inverse=True)
+    n = len(first)
+
+    level = {
+        name: np.bincount(parent, weights=child[name], minlength=n)
+        for name in ("x_sum", "y_sum", "count", "consumers", "loss_sum", "loss_count")
+    }
+    worst = np.full(n, -1, dtype=np.int64)
+    np.maximum.at(worst, parent, child["worst"])
+    level["worst"] = worst
+    level["first"] = child["first"][first]
+    level["parent"] = parent
+    return level
+
+
+def build_clusters(points: pd.DataFrame, min_zoom: int = 0, max_zoom: int = 14,
+                   radius: int = 64) -> Dict[int, Dict[str, np.ndarray]]:
+    """
+    Build the cluster hierarchy for every zoom from ``max_zoom`` down.
+
+    Args:
+        points: Feeder points from ``load_feeder_points``
+        min_zoom: Lowest zoom level
+        max_zoom: Highest clustered zoom (the map shows raw feeders above it)
+        radius: Grid cell size in screen pixels
+
+    Returns:
+        Dictionary of cluster arrays keyed by zoom
+    """
+    levels = {}
+    child = _leaf_level(points)
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+        child = levels[zoom] = cluster_level(child, zoom, radius)
+    return levels
+
+
+def cluster_features(level: Dict[str, np.ndarray], points: pd.DataFrame) -> pd.DataFrame:
+    """
+    Flatten one zoom's clusters into a table of output attributes.
+
+    Args:
+        level: Cluster arrays for one zoom
+        points: Feeder points (for the ids of single-feeder clusters)
+
+    Returns:
+        DataFrame with x, y, lon, lat and aggregated attributes per cluster
+    """
+    x = level["x_sum"] / level["count"]
+    y = level["y_sum"] / level["count"]
+    lon, lat = unproject(x, y)
+    count = level["count"].astype(np.int64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_loss = np.round(level["loss_sum"] / level["loss_count"], 2)
+    statuses = np.asarray(MAINTENANCE_ORDER + ["Unknown"], dtype=object)
+    return pd.DataFrame({
+        "x": x,
+        "y": y,
+        "lon": np.round(lon, 6),
+        "lat": np.round(lat, 6),
+        "count": count,
+        "consumers": level["consumers"].astype(np.int64),
+        "mean_td_loss_percent": mean_loss,
+        "worst_maintenance_status": statuses[level["worst"]],
+        "feeder_id": np.where(count == 1, points["feeder_id"].to_numpy()[level["first"]], None),
+    })
+
+
+def _tile_geojson(clusters: pd.DataFrame) -> Dict[str, Any]:
+    """Build a GeoJSON FeatureCollection for the clusters of one tile."""
+    features = []
+    for row in clusters.itertuples(index=False):
+        properties = {
+            "count": int(row.count),
+            "consumers": int(row.consumers),
+            "mean_td_loss_percent": None if np.isnan(row.mean_td_loss_percent) else float(row.mean_td_loss_percent),
+            "worst_maintenance_status": row.worst_maintenance_status,
+        }
+        if isinstance(row.feeder_id, str):
+            properties["feeder_id"] = row.feeder_id
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [row.lon, row.lat]},
+            "properties": properties,
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def write_tiles(levels: Dict[int, Dict[str, np.ndarray]], points: pd.DataFrame,
+                output_dir: str, radius: int) -> Dict[str, Any]:
+    """
+    Write one GeoJSON file per non-empty tile and an ``index.json``.
+
+    Args:
+        levels: Result of ``build_clusters``
+        points: Feeder points
+        output_dir: Output directory
+        radius: Grid cell size used (recorded in the index)
+
+    Returns:
+        The index dictionary
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    index = {
+        "min_zoom": min(levels),
+        "max_zoom": max(levels),
+        "radius": radius,
+        "feeders": len(points),
+        "bounds": [float(points["lon"].min()), float(points["lat"].min()),
+                   float(points["lon"].max()), float(points["lat"].max())],
+        "zooms": {},
+    }
+    for zoom in sorted(levels):
+        zoom_dir = output_dir / str(zoom)
+        # Tiles of an earlier build would otherwise linger
+        if zoom_dir.exists():
+            shutil.rmtree(zoom_dir)
+
+        clusters = cluster_features(levels[zoom], points)
+        tiles = 2 ** zoom
+        clusters["tx"] = np.floor(clusters["x"] * tiles).astype(np.int64)
+        clusters["ty"] = np.floor(clusters["y"] * tiles).astype(np.int64)
+
+        tile_list: List[List[int]] = []
+        largest = 0
+        for (tx, ty), group in clusters.groupby(["tx", "ty"], sort=True):
+            path = zoom_dir / str(tx) / f"{ty}.geojson"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(_tile_geojson(group), f, separators=(",", ":"))
+            tile_list.append([int(tx), int(ty)])
+            largest = max(largest, len(group))
+
+        index["zooms"][str(zoom)] = {
+            "clusters": len(clusters),
+            "tiles": tile_list,
+            "max_clusters_per_tile": largest,
+        }
+
+    with open(output_dir / "index.json", "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+    return index
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Build per-zoom clustered tiles for the feeder map markers"
+    )
+    parser.add_argument("--input", type=str, default=DEFAULT_INPUT,
+                        help=f"Feeder CSV or GeoJSON (default: {DEFAULT_INPUT})")
+    parser.add_argument("--output", type=str, default=DEFAULT_OUTPUT,
+                        help=f"Output tile directory (default: {DEFAULT_OUTPUT})")
+    parser.add_argument("--min-zoom", type=int, default=0,
+                        help="Lowest zoom level (default: 0)")
+    parser.add_argument("--max-zoom", type=int, default=14,
+                        help="Highest clustered zoom level (default: 14)")
+    parser.add_argument("--radius", type=int, default=64,
+                        help="Cluster cell size in screen pixels (default: 64)")
+    args = parser.parse_args()
+
+    if args.min_zoom > args.max_zoom:
+        raise ValueError("--min-zoom must not exceed --max-zoom")
+
+    start = time.perf_counter()
+    points = load_feeder_points(args.input)
+    print(f"Loaded {len(points):,} feeders from {args.input}")
+
+    levels = build_clusters(points, args.min_zoom, args.max_zoom, args.radius)
+    index = write_tiles(levels, points, args.output, args.radius)
+
+    for zoom, info in index["zooms"].items():
+        print(f"  z{zoom}: {info['clusters']:,} clusters in {len(info['tiles']):,} tiles "
+              f"(max {info['max_clusters_per_tile']:,} per tile)")
+    print(f"\n✅ Wrote cluster tiles to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Shared loader for the repository's CSV inputs.
+
+CSVs are parsed with pyarrow's multithreaded reader against declared schemas
+(dictionary-encoded categoricals, float64 measures, parsed dates), and the
+resulting table is cached as an uncompressed Feather (Arrow IPC) file next to
+the source, e.g. ``feeder_data.csv.arrow``. The cache records the source's
+size and mtime in its schema metadata; while they match, later loads
+memory-map the cache instead of re-parsing text, so repeated loads of the
+feeder, UC and tax datasets are near-instant.
+
+Usage::
+
+    from data_loader import load_csv
+    feeders = load_csv("data/dummy/feeder_data.csv")   # schema detected from header
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.feather as feather
+
+
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+CACHE_SUFFIX = ".arrow"
+# Bump when a schema changes so existing caches are rebuilt
+CACHE_VERSION = "2"
+
+# Declared column types per dataset; columns not listed are type-inferred.
+# ``months`` maps label columns to their strptime format for parse_months=True.
+SCHEMAS = {
+    # Measures stay float64: they are written back out (GeoJSON properties,
+    # derived CSVs) and float32 would turn e.g. 930.09 into 930.0900268554688
+    "feeder": {
+        "columns": {
+            "feeder_id": pa.string(),
+            "feeder_name": pa.string(),
+            "uc_name": CATEGORY,
+            "province": CATEGORY,
+            "district": CATEGORY,
+            "consumers": pa.int32(),
+            "circuit_length_km": pa.float64(),
+            "peak_load_mw": pa.float64(),
+            "td_loss_percent": pa.float64(),
+            "technical_loss_percent": pa.float64(),
+            "non_technical_loss_percent": pa.float64(),
+            "recovery_percent": pa.float64(),
+            "line_type": CATEGORY,
+            "maintenance_status": CATEGORY,
+            "lat": pa.float64(),
+            "lon": pa.float64(),
+        },
+    },
+    "uc": {
+        # Volumes reach ~1e10 and rates are written back at full precision
+        # (sample_data.py), so both stay float64
+        "columns": {
+            "month": CATEGORY,
+            "uc": pa.int64(),
+            "PROVINCE": CATEGORY,
+            "DISTRICT": CATEGORY,
+            "TEHSIL": CATEGORY,
+            "geometry": pa.string(),
+            "mth_unit_recieved_dummy": pa.float64(),
+            "mth_unit_billed_dummy": pa.float64(),
+            "assessment_dummy": pa.float64(),
+            "payment_dummy": pa.float64(),
+            "td_loss_dummy": pa.float64(),
+            "recovery_loss_dummy": pa.float64(),
+        },
+        "months": {"month": "%y-%b"},
+    },
+    "tax": {
+        "columns": {
+            "fiscal_year": CATEGORY,
+            "year_index": pa.int16(),
+            "quarter": CATEGORY,
+            "quarter_index": pa.int16(),
+            "month": CATEGORY,
+            "total_collection_billion": pa.float64(),
+            "income_tax_billion": pa.float64(),
+            "sales_tax_billion": pa.float64(),
+            "customs_duty_billion": pa.float64(),
+            "federal_excise_billion": pa.float64(),
+            "salaried_tax_billion": pa.float64(),
+            "corporate_tax_billion": pa.float64(),
+            "business_tax_billion": pa.float64(),
+            "capital_gains_tax_billion": pa.float64(),
+            "salaried_income_billion": pa.float64(),
+            "corporate_income_billion": pa.float64(),
+            "business_income_billion": pa.float64(),
+            "capital_gains_income_billion": pa.float64(),
+            "salaried_tax_rate_percent": pa.float64(),
+            "corporate_tax_rate_percent": pa.float64(),
+            "business_tax_rate_percent": pa.float64(),
+            "capital_gains_tax_rate_percent": pa.float64(),
+            "salaried_reported_income_billion": pa.float64(),
+            "laffer_effect": pa.float64(),
+            "elasticity": pa.float64(),
+            "salaried_burden_percent": pa.float64(),
+            "revenue_efficiency": pa.float64(),
+        },
+    },
+    "nepra": {
+        "columns": {
+            "Dataset Name": CATEGORY,
+            "Observation Date": pa.timestamp("s"),
+            "Series Key": CATEGORY,
+            "Series Display Name": CATEGORY,
+            "Observation Value": pa.float64(),
+            "Unit": CATEGORY,
+            "Observation Status": CATEGORY,
+            "Observation Status Comment": pa.string(),
+            "Sequence No.": pa.int32(),
+            "Series name": CATEGORY,
+        },
+        "timestamp_parsers": ["%d-%b-%Y"],
+    },
+}
+
+
+def detect_schema(path: Union[str, Path]) -> Optional[str]:
+    """
+    Pick the declared schema whose columns best cover the file's header.
+
+    Args:
+        path: CSV file
+
+    Returns:
+        Schema name, or None if no schema matches at least half the header
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    best, best_share = None, 0.5
+    for name, schema in SCHEMAS.items():
+        share = len(set(header) & set(schema["columns"])) / max(len(header), 1)
+        if share >= best_share:
+            best, best_share = name, share
+    return best
+
+
+def cache_path(path: Union[str, Path]) -> Path:
+    """Feather cache location for a CSV (``<file>.csv.arrow``)."""
+    path = Path(path)
+    return path.with_name(path.name + CACHE_SUFFIX)
+
+
+def _cache_key(path: Path, schema_name: Optional[str]) -> Dict[bytes, bytes]:
+    stat = path.stat()
+    return {
+        b"source_size": str(stat.st_size).encode(),
+        b"source_mtime_ns": str(stat.st_mtime_ns).encode(),
+        b"schema": (schema_name or "").encode(),
+        b"cache_version": CACHE_VERSION.encode(),
+    }
+
+
+def read_csv_arrow(path: Union[str, Path], schema_name: Optional[str] = None) -> pa.Table:
+    """
+    Parse a CSV with pyarrow's multithreaded reader and a declared schema.
+
+    Args:
+        path: CSV file
+        schema_name: Key into SCHEMAS (None for full type inference)
+
+    Returns:
+        Arrow table
+    """
+    schema = SCHEMAS.get(schema_name, {}) if schema_name else {}
+    convert_options = pv.ConvertOptions(
+        column_types=schema.get("columns", {}),
+        timestamp_parsers=schema.get("timestamp_parsers"),
+        strings_can_be_null=True,
+    )
+    return pv.read_csv(path, convert_options=convert_options)
+
+
+def _read_cache(cache: Path, key: Dict[bytes, bytes]) -> Optional[pa.Table]:
+    """Memory-map a cache file, or return None if it is missing or stale."""
+    if not cache.exists():
+        return None
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(str(cache), "r"))
+        metadata = reader.schema.metadata or {}
+        if any(metadata.get(k) != v for k, v in key.items()):
+            return None
+        return reader.read_all()
+    except (pa.ArrowInvalid, OSError):
+        return None
+
+
+def _write_cache(table: pa.Table, cache: Path, key: Dict[bytes, bytes]):
+    """Write an uncompressed Feather cache atomically; skip if not writable."""
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **key})
+    tmp = cache.with_name(cache.name + f".{os.getpid()}.tmp")
+    try:
+        # Uncompressed so later reads are zero-copy from the memory map
+        feather.write_feather(table, str(tmp), compression="uncompressed")
+        os.replace(tmp, cache)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def load_table(
+    path: Union[str, Path],
+    schema: Optional[str] = "auto",
+    columns: Optional[List[str]] = None,
+    parse_months: bool = False,
+    cache: bool = True,
+) -> pa.Table:
+    """
+    Load a CSV as an Arrow table, through the Feather cache.
+
+    Args:
+        path: CSV file
+        schema: Key into SCHEMAS, "auto" to detect from the header, or None
+        columns: Columns to return (default: all)
+        parse_months: Replace month label columns with parsed timestamps
+        cache: Read and write the Feather cache next to the source
+
+    Returns:
+        Arrow table
+    """
+    path = Path(path)
+    if schema == "auto":
+        schema = detect_schema(path)
+    elif schema is not None and schema not in SCHEMAS:
+        raise ValueError(f"Unknown schema '{schema}'. Available: {', '.join(SCHEMAS)}")
+
+    table = None
+    if cache:
+        key = _cache_key(path, schema)
+        table = _read_cache(cache_path(path), key)
+    if table is None:
+        table = read_csv_arrow(path, schema)
+        if cache:
+            _write_cache(table, cache_path(path), key)
+
+    if columns is not None:
+        table = table.select(columns)
+
+    if parse_months and schema:
+        for column, fmt in SCHEMAS[schema].get("months", {}).items():
+            if column in table.column_names:
+                labels = pc.cast(table[column], pa.string())
+                parsed = pc.strptime(labels, format=fmt, unit="s")
+                table = table.set_column(table.schema.get_field_index(column), column, parsed)
+
+    return table
+
+
+def load_csv(
+    path: Union[str, Path],
+    schema: Optional[str] = "auto",
+    columns: Optional[List[str]] = None,
+    parse_months: bool = False,
+    cache: bool = True,
+) -> pd.DataFrame:
+    """
+    Load a CSV as a DataFrame, through the Feather cache.
+
+    Dictionary-encoded columns become pandas categoricals. Arguments are the
+    same as for ``load_table``.
+
+    Returns:
+        DataFrame
+    """
+    return load_table(path, schema, columns, parse_months, cache).to_pandas()
+
+
+def load_records(path: Union[str, Path], schema: Optional[str] = "auto", cache: bool = True) -> List[Dict[str, Any]]:
+    """
+    Load a CSV as a list of typed row dictionaries (a ``csv.DictReader`` replacement).
+
+    Args:
+        path: CSV file
+        schema: Key into SCHEMAS, "auto" to detect from the header, or None
+        cache: Read and write the Feather cache next to the source
+
+    Returns:
+        List of dictionaries, one per row
+    """
+    return load_table(path, schema, cache=cache).to_pylist()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Build (or refresh) Feather caches for CSV inputs and time the loads"
+    )
+    parser.add_argument("files", nargs="+", help="CSV files to cache")
+    parser.add_argument("--schema", type=str, default="auto",
+                        help=f"Schema name ({', '.join(SCHEMAS)}) or auto (default: auto)")
+    args = parser.parse_args()
+
+    for path in args.files:
+        start = time.perf_counter()
+        table = load_table(path, args.schema)
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_table(path, args.schema)
+        cached = time.perf_counter() - start
+
+        print(f"{path}: {table.num_rows:,} rows, {table.nbytes / 1e6:.1f} MB in memory; "
+              f"first load {first * 1000:.1f} ms, cached load {cached * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
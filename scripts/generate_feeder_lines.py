@@ -13,11 +13,103 @@ from typing import List, Dict, Tuple, Any
 
 import geopandas as gpd
 import pandas as pd
+import shapely
 from shapely.geometry import LineString, Point, Polygon
 from shapely.ops import unary_union
 import numpy as np
 
 
+class FeederLines:
+    """
+    Generated feeder lines held as ragged arrays.
+
+    Coordinates of all lines are stored in one ``(n_points, 2)`` array with an
+    ``offsets`` array marking where each line starts, and attributes live in a
+    columnar properties table. GeoJSON, GeoDataFrame and Arrow views are built
+    only when requested.
+    """
+
+    def __init__(self, coords: np.ndarray, offsets: np.ndarray, properties: pd.DataFrame):
+        """
+        Args:
+            coords: Array of shape (n_points, 2) with x/y coordinates
+            offsets: Array of length n_lines + 1 with line start positions
+            properties: DataFrame with one row per line
+        """
+        self.coords = np.asarray(coords, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.properties = properties.reset_index(drop=True)
+
+    @classmethod
+    def concat(cls, parts: List["FeederLines"]) -> "FeederLines":
+        """Concatenate several FeederLines into one."""
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls(np.empty((0, 2)), np.zeros(1, dtype=np.int64), pd.DataFrame())
+
+        coords = np.concatenate([part.coords for part in parts])
+        point_starts = np.cumsum([0] + [len(part.coords) for part in parts[:-1]])
+        offsets = np.concatenate(
+            [[0]] + [part.offsets[1:] + start for part, start in zip(parts, point_starts)]
+        )
+        properties = pd.concat([part.properties for part in parts], ignore_index=True)
+        return cls(coords, offsets, properties)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        """Return a single line as a GeoJSON feature dictionary."""
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"FeederLines index {index} out of range for {len(self)} lines")
+        index %= len(self)
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return {
+            "type": "Feature",
+            "properties": self.properties.iloc[[index]].to_dict("records")[0],
+            "geometry": {
+                "type": "LineString",
+                "coordinates": self.coords[start:end].tolist(),
+            },
+        }
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def geometries(self) -> np.ndarray:
+        """Shapely LineStrings built in bulk from the ragged arrays."""
+        return shapely.from_ragged_array(
+            shapely.GeometryType.LINESTRING, self.coords, (self.offsets,)
+        )
+
+    def to_geojson(self) -> Dict[str, Any]:
+        """Build a GeoJSON FeatureCollection dictionary."""
+        records = self.properties.to_dict("records")
+        coords = self.coords.tolist()
+        features = []
+        for index, props in enumerate(records):
+            start, end = self.offsets[index], self.offsets[index + 1]
+            features.append({
+                "type": "Feature",
+                "properties": props,
+                "geometry": {"type": "LineString", "coordinates": coords[start:end]},
+            })
+        return {"type": "FeatureCollection", "features": features}
+
+    def to_geodataframe(self, crs: Any = "EPSG:4326") -> gpd.GeoDataFrame:
+        """Build a GeoDataFrame of the lines."""
+        return gpd.GeoDataFrame(self.properties.copy(), geometry=self.geometries, crs=crs)
+
+    def to_arrow(self):
+        """Build an Arrow table with a WKB ``geometry`` column."""
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(self.properties, preserve_index=False)
+        return table.append_column("geometry", pa.array(shapely.to_wkb(self.geometries)))
+
+
 class FeederLineGenerator:
     """Generate random feeder lines within UC polygon boundaries."""
 
@@ -87,6 +179,37 @@ class FeederLineGenerator:
             if self.point_in_polygon(point, polygon):
                 return point
 
+    def generate_random_points_in_polygon(self, polygon: Polygon, count: int) -> np.ndarray:
+        """
+        Generate random points within a polygon using batched rejection sampling.
+
+        Candidates are drawn in the bounding box in batches and tested with a
+        single vectorized ``contains_xy`` call per batch.
+
+        Args:
+            polygon: Shapely Polygon object
+            count: Number of points to generate
+
+        Returns:
+            Array of shape (count, 2) with points inside the polygon
+        """
+        minx, miny, maxx, maxy = self.get_polygon_bounds(polygon)
+        shapely.prepare(polygon)
+
+        points = np.empty((count, 2))
+        filled = 0
+        while filled < count:
+            batch = max(16, 2 * (count - filled))
+            xs = np.random.uniform(minx, maxx, batch)
+            ys = np.random.uniform(miny, maxy, batch)
+            inside = shapely.contains_xy(polygon, xs, ys)
+            take = min(int(inside.sum()), count - filled)
+            points[filled:filled + take, 0] = xs[inside][:take]
+            points[filled:filled + take, 1] = ys[inside][:take]
+            filled += take
+
+        return points
+
     def generate_random_line_in_polygon(
         self, polygon: Polygon, num_segments: int = 2
     ) -> LineString:
@@ -100,16 +223,11 @@ class FeederLineGenerator:
         Returns:
             A LineString that lies within the polygon
         """
-        points = []
-        for _ in range(num_segments):
-            point = self.generate_random_point_in_polygon(polygon)
-            points.append((point.x, point.y))
-        
-        return LineString(points)
+        return LineString(self.generate_random_points_in_polygon(polygon, num_segments))
 
     def generate_feeder_lines_for_uc(
         self, uc_index: int, num_lines: int = 5, num_segments: int = 2
-    ) -> List[Dict[str, Any]]:
+    ) -> FeederLines:
         """
         Generate feeder lines for a specific Union Council.
 
@@ -119,41 +237,33 @@ class FeederLineGenerator:
             num_segments: Number of segments per line
 
         Returns:
-            List of GeoJSON-compatible feature dictionaries
+            FeederLines holding the generated lines
         """
         uc_row = self.gdf.iloc[uc_index]
         polygon = uc_row.geometry
         uc_name = uc_row.get('uc_name', f"UC_{uc_index}")
         uc_id = uc_row.get('uc_id', uc_index)
 
-        feeder_lines = []
-        for line_num in range(num_lines):
-            line = self.generate_random_line_in_polygon(polygon, num_segments)
-            
-            feature = {
-                "type": "Feature",
-                "properties": {
-                    "feeder_id": f"{uc_id}_{line_num}",
-                    "uc_id": uc_id,
-                    "uc_name": uc_name,
-                    "line_number": line_num,
-                    "coordinates_count": len(line.coords),
-                },
-                "geometry": {
-                    "type": "LineString",
-                    "coordinates": list(line.coords),
-                },
-            }
-            feeder_lines.append(feature)
+        coords = self.generate_random_points_in_polygon(polygon, num_lines * num_segments)
+        offsets = np.arange(num_lines + 1, dtype=np.int64) * num_segments
+        line_numbers = np.arange(num_lines)
 
-        return feeder_lines
+        properties = pd.DataFrame({
+            "feeder_id": [f"{uc_id}_{line_num}" for line_num in line_numbers],
+            "uc_id": [uc_id] * num_lines,
+            "uc_name": [uc_name] * num_lines,
+            "line_number": line_numbers,
+            "coordinates_count": np.full(num_lines, num_segments),
+        })
+
+        return FeederLines(coords, offsets, properties)
 
     def generate_all_feeder_lines(
         self,
         num_lines_per_uc: int = 5,
         num_segments_per_line: int = 2,
         uc_indices: List[int] = None,
-    ) -> Dict[str, Any]:
+    ) -> FeederLines:
         """
         Generate feeder lines for all Union Councils.
 
@@ -163,12 +273,12 @@ class FeederLineGenerator:
             uc_indices: List of specific UC indices to process. If None, process all.
 
         Returns:
-            GeoJSON FeatureCollection with all feeder lines
+            FeederLines with all generated lines
         """
         if uc_indices is None:
             uc_indices = range(len(self.gdf))
 
-        all_features = []
+        parts = []
         total_ucs = len(uc_indices)
 
         for idx, uc_idx in enumerate(uc_indices):
@@ -176,66 +286,76 @@ class FeederLineGenerator:
                 print(f"Processing UC {idx + 1}/{total_ucs}...")
 
             try:
-                lines = self.generate_feeder_lines_for_uc(
+                parts.append(self.generate_feeder_lines_for_uc(
                     uc_idx, num_lines_per_uc, num_segments_per_line
-                )
-                all_features.extend(lines)
+                ))
             except Exception as e:
                 print(f"Error processing UC {uc_idx}: {e}")
                 continue
 
-        geojson_output = {
-            "type": "FeatureCollection",
-            "features": all_features,
-        }
-
-        print(f"Generated {len(all_features)} feeder lines")
-        return geojson_output
+        feeder_lines = FeederLines.concat(parts)
+        print(f"Generated {len(feeder_lines)} feeder lines")
+        return feeder_lines
 
-    def save_to_geojson(self, geojson_data: Dict[str, Any], output_path: str):
+    def save_to_geojson(self, feeder_lines: FeederLines, output_path: str):
         """
         Save generated feeder lines to a GeoJSON file.
 
         Args:
-            geojson_data: GeoJSON FeatureCollection dictionary
+            feeder_lines: Generated FeederLines
             output_path: Path to save the GeoJSON file
         """
         output_file = Path(output_path)
         output_file.parent.mkdir(parents=True, exist_ok=True)
 
         with open(output_file, "w") as f:
-            json.dump(geojson_data, f, indent=2)
+            json.dump(feeder_lines.to_geojson(), f, indent=2)
 
         print(f"Saved feeder lines to {output_file}")
 
-    def save_to_shapefile(
-        self, geojson_data: Dict[str, Any], output_path: str
-    ):
+    def save_to_shapefile(self, feeder_lines: FeederLines, output_path: str):
         """
         Save generated feeder lines to a Shapefile.
 
+        Geometries are encoded in bulk and written through pyogrio's Arrow
+        writer, without building per-feature objects.
+
         Args:
-            geojson_data: GeoJSON FeatureCollection dictionary
+            feeder_lines: Generated FeederLines
             output_path: Path to save the Shapefile (without extension)
         """
-        # Convert GeoJSON to GeoDataFrame
-        features = geojson_data["features"]
-        geometries = [
-            LineString(feature["geometry"]["coordinates"]) for feature in features
-        ]
-        properties = [feature["properties"] for feature in features]
-
-        gdf = gpd.GeoDataFrame(properties, geometry=geometries)
-        
+        from pyogrio import write_arrow
+
         output_file = Path(output_path)
         output_file.parent.mkdir(parents=True, exist_ok=True)
 
         # Shapefile requires .shp extension
         shapefile_path = str(output_file.with_suffix('.shp'))
-        gdf.to_file(shapefile_path)
+        write_arrow(
+            feeder_lines.to_arrow(),
+            shapefile_path,
+            geometry_name="geometry",
+            geometry_type="LineString",
+            crs=self.gdf.crs.to_string() if self.gdf.crs else None,
+        )
 
         print(f"Saved feeder lines to Shapefile: {shapefile_path}")
 
+    def save_to_geoparquet(self, feeder_lines: FeederLines, output_path: str):
+        """
+        Save generated feeder lines to a GeoParquet file.
+
+        Args:
+            feeder_lines: Generated FeederLines
+            output_path: Path to save the GeoParquet file
+        """
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        feeder_lines.to_geodataframe(crs=self.gdf.crs).to_parquet(output_file)
+
+        print(f"Saved feeder lines to GeoParquet: {output_file}")
+
 
 def main():
     """Main entry point."""
@@ -259,6 +379,12 @@ def main():
         default=None,
         help="Output Shapefile path without extension (optional)",
     )
+    parser.add_argument(
+        "--output-geoparquet",
+        type=str,
+        default=None,
+        help="Output GeoParquet file path (optional)",
+    )
     parser.add_argument(
         "--lines-per-uc",
         type=int,
@@ -306,17 +432,20 @@ def main():
     print(f"  Lines per UC: {args.lines_per_uc}")
     print(f"  Segments per line: {args.segments_per_line}")
     
-    geojson_data = generator.generate_all_feeder_lines(
+    feeder_lines = generator.generate_all_feeder_lines(
         num_lines_per_uc=args.lines_per_uc,
         num_segments_per_line=args.segments_per_line,
         uc_indices=uc_indices,
     )
 
     # Save outputs
-    generator.save_to_geojson(geojson_data, args.output_geojson)
+    generator.save_to_geojson(feeder_lines, args.output_geojson)
 
     if args.output_shapefile:
-        generator.save_to_shapefile(geojson_data, args.output_shapefile)
+        generator.save_to_shapefile(feeder_lines, args.output_shapefile)
+
+    if args.output_geoparquet:
+        generator.save_to_geoparquet(feeder_lines, args.output_geoparquet)
 
     print("\nDone!")
 
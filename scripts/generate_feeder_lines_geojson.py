@@ -1,14 +1,28 @@
 """
 Generate feeder lines as LineStrings (from point A to point B) instead of just Points.
 Converts the feeder data to GeoJSON with proper line geometries.
+
+With --batch, all feeders' random walks are generated together as NumPy
+arrays and kept inside each feeder's own union council: every step's
+endpoints are tested against the UC polygons in one vectorized
+``shapely.contains_xy`` call (then the passing segments with
+``shapely.contains``), and only the steps that leave the UC are redrawn,
+with a shorter step on each retry. Recorded locations that fall outside
+the feeder's UC are snapped to the nearest point inside it; such features
+carry ``start_moved`` and the recorded ``recorded_lon``/``recorded_lat``.
 """
 
+import argparse
+import glob
 import json
-import csv
 import random
 from pathlib import Path
 import math
 
+import numpy as np
+
+from data_loader import load_records, load_table
+
 def haversine_distance(lat1, lon1, lat2, lon2):
     """Calculate distance between two coordinates in km."""
     R = 6371  # Earth's radius in kilometers
@@ -66,13 +80,252 @@ def generate_feeder_line(start_lat, start_lon, circuit_length_km, num_segments=5
     return coordinates
 
 def load_feeder_data(csv_path):
-    """Load feeder data from CSV file."""
-    feeders = []
-    with open(csv_path, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            feeders.append(row)
-    return feeders
+    """Load typed feeder records from CSV (via the shared Feather cache)."""
+    return load_records(csv_path, schema="feeder")
+
+def feeder_properties(feeder):
+    """GeoJSON properties for one feeder record."""
+    return {
+        "feeder_id": feeder['feeder_id'],
+        "feeder_name": feeder['feeder_name'],
+        "uc_name": feeder['uc_name'],
+        "province": feeder['province'],
+        "district": feeder['district'],
+        "consumers": int(feeder.get('consumers', 0)),
+        "circuit_length_km": float(feeder.get('circuit_length_km', 0)),
+        "peak_load_mw": float(feeder.get('peak_load_mw', 0)),
+        "td_loss_percent": float(feeder.get('td_loss_percent', 0)),
+        "technical_loss_percent": float(feeder.get('technical_loss_percent', 0)),
+        "non_technical_loss_percent": float(feeder.get('non_technical_loss_percent', 0)),
+        "recovery_percent": float(feeder.get('recovery_percent', 0)),
+        "line_type": feeder.get('line_type', 'Unknown'),
+        "maintenance_status": feeder.get('maintenance_status', 'Unknown')
+    }
+
+def load_uc_index(geojson_dir):
+    """
+    Build an index from (province, district, uc_name) to UC geometry.
+
+    UC names repeat across districts, so the key includes province and
+    district. Multi-part UCs are dissolved into one geometry, and the
+    geometries are prepared for repeated containment tests.
+
+    Args:
+        geojson_dir: Directory holding the union_councils_*.geojson files
+
+    Returns:
+        GeoSeries indexed by (PROVINCE, DISTRICT, uc_name)
+    """
+    import geopandas as gpd
+    import pandas as pd
+    import shapely
+
+    files = sorted(glob.glob(str(Path(geojson_dir) / "union_councils_*.geojson")))
+    if not files:
+        raise FileNotFoundError(f"No union_councils_*.geojson files in {geojson_dir}")
+
+    ucs = gpd.GeoDataFrame(pd.concat([gpd.read_file(f) for f in files], ignore_index=True))
+    index = ucs.dissolve(["PROVINCE", "DISTRICT", "uc_name"]).geometry
+    shapely.prepare(index.values)
+    return index
+
+def lookup_uc_geometries(uc_index, provinces, districts, uc_names):
+    """
+    Look up each feeder's UC geometry.
+
+    Args:
+        uc_index: Result of ``load_uc_index``
+        provinces, districts, uc_names: Per-feeder key arrays
+
+    Returns:
+        Object array of geometries (None where the UC is not found)
+    """
+    import pandas as pd
+
+    keys = pd.MultiIndex.from_arrays([provinces, districts, uc_names])
+    geoms = uc_index.reindex(keys).values
+    return np.asarray(geoms, dtype=object)
+
+def points_inside(geoms, lon, lat):
+    """Vectorized containment test; feeders without a UC polygon always pass."""
+    import shapely
+
+    inside = np.ones(len(lon), dtype=bool)
+    known = ~shapely.is_missing(geoms)
+    if known.any():
+        inside[known] = shapely.contains_xy(geoms[known], lon[known], lat[known])
+    return inside
+
+def segments_inside(geoms, lon0, lat0, lon1, lat1):
+    """
+    Vectorized test that new segments stay inside their UC.
+
+    Endpoints are screened with ``contains_xy`` first; only segments whose
+    endpoint passes are tested as whole lines, which catches segments that
+    cut across a concave boundary.
+    """
+    import shapely
+
+    inside = points_inside(geoms, lon1, lat1)
+    check = inside & ~shapely.is_missing(geoms)
+    if check.any():
+        segments = shapely.linestrings(
+            np.stack([lon0[check], lat0[check], lon1[check], lat1[check]], axis=1).reshape(-1, 2, 2)
+        )
+        inside[check] = shapely.contains(geoms[check], segments)
+    return inside
+
+def snap_starts(geoms, lon, lat, nudge=(1e-5, 1e-4, 1e-3)):
+    """
+    Snap start points that lie outside their UC to the nearest point inside it.
+
+    The nearest boundary point is pushed slightly past the boundary (trying
+    each ``nudge``, in degrees); starts where that still misses fall back to
+    ``shapely.point_on_surface``.
+
+    Args:
+        geoms: Per-feeder UC geometries
+        lon, lat: Start coordinates (updated in place)
+        nudge: Distances past the boundary to try, in degrees
+
+    Returns:
+        Boolean array marking the starts that were moved
+    """
+    import shapely
+
+    moved = ~points_inside(geoms, lon, lat)
+    pending = np.flatnonzero(moved)
+    if len(pending) == 0:
+        return moved
+
+    nearest = shapely.get_point(
+        shapely.shortest_line(shapely.points(lon[pending], lat[pending]), geoms[pending]), 1)
+    near_lon, near_lat = shapely.get_x(nearest), shapely.get_y(nearest)
+    dx, dy = near_lon - lon[pending], near_lat - lat[pending]
+    norm = np.hypot(dx, dy)
+    norm[norm == 0] = 1.0
+    for step in nudge:
+        cand_lon = near_lon + dx / norm * step
+        cand_lat = near_lat + dy / norm * step
+        inside = points_inside(geoms[pending], cand_lon, cand_lat)
+        lon[pending[inside]] = cand_lon[inside]
+        lat[pending[inside]] = cand_lat[inside]
+        pending, near_lon, near_lat = pending[~inside], near_lon[~inside], near_lat[~inside]
+        dx, dy, norm = dx[~inside], dy[~inside], norm[~inside]
+        if len(pending) == 0:
+            break
+
+    if len(pending):
+        surface = shapely.point_on_surface(geoms[pending])
+        lon[pending] = shapely.get_x(surface)
+        lat[pending] = shapely.get_y(surface)
+    return moved
+
+def generate_feeder_lines_batch(lat, lon, circuit_length_km, geoms, num_segments=5,
+                                max_attempts=20, shrink=0.7, rng=None):
+    """
+    Generate all feeders' lines at once, keeping every vertex inside its UC.
+
+    Each step draws a bearing for every feeder, tests all new segments
+    against the feeders' UC polygons in one vectorized pass and redraws only
+    the failures, shrinking their step each time. Vertices that still fail
+    after ``max_attempts`` stay at the previous vertex.
+
+    Args:
+        lat, lon: Start coordinates per feeder
+        circuit_length_km: Circuit length per feeder
+        geoms: Per-feeder UC geometries (None to skip the check)
+        num_segments: Number of waypoints in each line
+        max_attempts: Redraws per step before giving up
+        shrink: Step length factor applied on each redraw
+        rng: NumPy random generator
+
+    Returns:
+        Array of shape (n_feeders, num_segments, 2) with [lon, lat] vertices
+    """
+    rng = rng or np.random.default_rng()
+    n = len(lat)
+    coords = np.empty((n, num_segments, 2))
+    coords[:, 0, 0] = lon
+    coords[:, 0, 1] = lat
+
+    # Same spacing as generate_feeder_line: each step covers L / num_segments
+    step_km = np.asarray(circuit_length_km, dtype=np.float64) / num_segments
+
+    for step in range(1, num_segments):
+        current_lon = coords[:, step - 1, 0]
+        current_lat = coords[:, step - 1, 1]
+        coords[:, step] = coords[:, step - 1]
+
+        pending = np.arange(n)
+        distance = step_km.copy()
+        for _ in range(max_attempts):
+            if len(pending) == 0:
+                break
+            bearing = np.radians(rng.uniform(0, 360, len(pending)))
+            d = distance[pending]
+            new_lat = current_lat[pending] + (d / 111) * np.cos(bearing)
+            new_lon = current_lon[pending] + (d / (111 * np.cos(np.radians(current_lat[pending])))) * np.sin(bearing)
+
+            inside = segments_inside(geoms[pending], current_lon[pending], current_lat[pending],
+                                     new_lon, new_lat)
+            coords[pending[inside], step, 0] = new_lon[inside]
+            coords[pending[inside], step, 1] = new_lat[inside]
+            pending = pending[~inside]
+            distance[pending] *= shrink
+
+    return coords
+
+def generate_feeder_geojson_batch(csv_path, output_path, geojson_dir="data/geo/geojson",
+                                  num_segments=5, seed=None):
+    """Generate feeder GeoJSON with in-UC LineStrings using the batched walk."""
+    import shapely
+
+    table = load_table(csv_path, schema="feeder")
+    feeders = table.to_pylist()
+    print(f"Loaded {len(feeders)} feeder records from CSV")
+
+    def column(name):
+        return table.column(name).to_pandas().to_numpy()
+
+    uc_index = load_uc_index(geojson_dir)
+    geoms = lookup_uc_geometries(uc_index, column('province').astype(str),
+                                 column('district').astype(str), column('uc_name').astype(str))
+    print(f"Matched {int((~shapely.is_missing(geoms)).sum())} of {len(feeders)} feeders to UC polygons")
+
+    rng = np.random.default_rng(seed)
+    recorded_lat = column('lat').astype(np.float64)
+    recorded_lon = column('lon').astype(np.float64)
+    lat, lon = recorded_lat.copy(), recorded_lon.copy()
+    moved = snap_starts(geoms, lon, lat)
+    if moved.any():
+        print(f"Snapped {int(moved.sum())} feeder start points into their UC "
+              f"(recorded location kept in recorded_lon/recorded_lat)")
+
+    coords = generate_feeder_lines_batch(
+        lat, lon, column('circuit_length_km').astype(np.float64), geoms,
+        num_segments=num_segments, rng=rng,
+    )
+    outside = ~shapely.is_missing(geoms) & ~shapely.contains(geoms, shapely.linestrings(coords))
+    print(f"Lines leaving their UC: {int(outside.sum())}")
+
+    features = [
+        {
+            "type": "Feature",
+            "properties": {
+                **feeder_properties(feeder),
+                "start_moved": bool(was_moved),
+                "recorded_lon": float(rec_lon),
+                "recorded_lat": float(rec_lat),
+            },
+            "geometry": {
+                "type": "LineString",
+                "coordinates": line.tolist()
+            }
+        }
+        for feeder, line, was_moved, rec_lon, rec_lat in zip(feeders, coords, moved, recorded_lon, recorded_lat)
+    ]
+    write_feature_collection(features, output_path)
 
 def generate_feeder_geojson(csv_path, output_path):
     """Generate feeder GeoJSON with LineString geometries."""
@@ -95,22 +348,7 @@ def generate_feeder_geojson(csv_path, output_path):
             
             feature = {
                 "type": "Feature",
-                "properties": {
-                    "feeder_id": feeder['feeder_id'],
-                    "feeder_name": feeder['feeder_name'],
-                    "uc_name": feeder['uc_name'],
-                    "province": feeder['province'],
-                    "district": feeder['district'],
-                    "consumers": int(feeder.get('consumers', 0)),
-                    "circuit_length_km": float(feeder.get('circuit_length_km', 0)),
-                    "peak_load_mw": float(feeder.get('peak_load_mw', 0)),
-                    "td_loss_percent": float(feeder.get('td_loss_percent', 0)),
-                    "technical_loss_percent": float(feeder.get('technical_loss_percent', 0)),
-                    "non_technical_loss_percent": float(feeder.get('non_technical_loss_percent', 0)),
-                    "recovery_percent": float(feeder.get('recovery_percent', 0)),
-                    "line_type": feeder.get('line_type', 'Unknown'),
-                    "maintenance_status": feeder.get('maintenance_status', 'Unknown')
-                },
+                "properties": feeder_properties(feeder),
                 "geometry": {
                     "type": "LineString",
                     "coordinates": line_coordinates
@@ -122,7 +360,10 @@ def generate_feeder_geojson(csv_path, output_path):
             print(f"Error processing feeder {feeder.get('feeder_id', 'unknown')}: {e}")
             continue
     
-    # Create FeatureCollection
+    write_feature_collection(features, output_path)
+
+def write_feature_collection(features, output_path):
+    """Write features as a GeoJSON FeatureCollection."""
     geojson = {
         "type": "FeatureCollection",
         "features": features
@@ -139,8 +380,24 @@ def generate_feeder_geojson(csv_path, output_path):
     print(f"Saved to {output_file}")
 
 if __name__ == "__main__":
-    csv_path = "data/dummy/feeder_data.csv"
-    output_path = "data/geo/geojson/feeders.geojson"
-    
-    generate_feeder_geojson(csv_path, output_path)
+    parser = argparse.ArgumentParser(description="Generate feeder LineStrings from the feeder CSV")
+    parser.add_argument('--csv', type=str, default="data/dummy/feeder_data.csv",
+                        help="Feeder CSV (default: data/dummy/feeder_data.csv)")
+    parser.add_argument('--output', type=str, default="data/geo/geojson/feeders.geojson",
+                        help="Output GeoJSON (default: data/geo/geojson/feeders.geojson)")
+    parser.add_argument('--batch', action='store_true',
+                        help="Generate all lines as arrays, clipped to each feeder's UC polygon")
+    parser.add_argument('--geojson-dir', type=str, default="data/geo/geojson",
+                        help="Directory with union_councils_*.geojson (batch mode)")
+    parser.add_argument('--segments', type=int, default=5,
+                        help="Waypoints per line in batch mode (default: 5)")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Random seed for batch mode")
+    args = parser.parse_args()
+
+    if args.batch:
+        generate_feeder_geojson_batch(args.csv, args.output, args.geojson_dir,
+                                      num_segments=args.segments, seed=args.seed)
+    else:
+        generate_feeder_geojson(args.csv, args.output)
     print("Feeder GeoJSON generation complete!")
@@ -14,28 +14,28 @@ import os
 # Set random seed for reproducibility
 np.random.seed(42)
 
+FISCAL_YEARS = ['2018-19', '2019-20', '2020-21', '2021-22', '2022-23', '2023-24', '2024-25']
+QUARTERS = ['Q1', 'Q2', 'Q3', 'Q4']
+MONTHS_MAP = {
+    'Q1': ['Jul', 'Aug', 'Sep'],
+    'Q2': ['Oct', 'Nov', 'Dec'],
+    'Q3': ['Jan', 'Feb', 'Mar'],
+    'Q4': ['Apr', 'May', 'Jun']
+}
+
 def generate_fbr_tax_data():
     """Generate comprehensive FBR tax collection dataset"""
     
-    years = ['2018-19', '2019-20', '2020-21', '2021-22', '2022-23', '2023-24', '2024-25']
-    quarters = ['Q1', 'Q2', 'Q3', 'Q4']
-    months_map = {
-        'Q1': ['Jul', 'Aug', 'Sep'],
-        'Q2': ['Oct', 'Nov', 'Dec'],
-        'Q3': ['Jan', 'Feb', 'Mar'],
-        'Q4': ['Apr', 'May', 'Jun']
-    }
-    
     data = []
     
-    for year_idx, year in enumerate(years):
+    for year_idx, year in enumerate(FISCAL_YEARS):
         # Base growth factor (economy growing ~15% per year)
         base_growth = 1 + (year_idx * 0.15)
         
         # Tax rate increases over time
         tax_rate_multiplier = 1 + (year_idx * 0.08)
         
-        for quarter_idx, quarter in enumerate(quarters):
+        for quarter_idx, quarter in enumerate(QUARTERS):
             # Seasonal variation
             seasonal_factor = 1 + (quarter_idx * 0.05)
             
@@ -113,7 +113,7 @@ def generate_fbr_tax_data():
             revenue_efficiency = total_collection / avg_rate if avg_rate > 0 else 0
             
             # Create record for each month in the quarter
-            for month in months_map[quarter]:
+            for month in MONTHS_MAP[quarter]:
                 record = {
                     'fiscal_year': year,
                     'year_index': year_idx,
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Generate the national UC monthly panel for load testing.
+
+Every UC in the four ``union_councils_*.geojson`` files is crossed with N
+months. Units received, billed, assessment and payment are drawn with
+NumPy from correlated per-UC effects (base load scaled by UC area, a
+province-level loss baseline, a tariff, and a recovery propensity that falls
+as losses rise), with a seasonal load cycle and monthly noise. T&D loss and
+recovery loss are derived from the rounded volumes, so the output passes the
+UC rules in validate_data.py.
+
+Rows are generated one month at a time and written straight to a
+PROVINCE/month partitioned store in the uc_dataset.py layout (and optionally
+to a ``dummy_data.csv``-style CSV), so memory stays flat however many months
+or UC replicas are requested. The default store is ``data/dummy/uc_panel``,
+kept apart from the ingested store (``data/dummy/uc_monthly``), which is
+refused; running aggregates left in a regenerated panel store are dropped.
+"""
+
+import argparse
+import glob
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import shapely
+
+from ingest_uc_month import AGGREGATES_DIR
+from uc_dataset import DEFAULT_STORE, FILE_SCHEMA, partition_dir, write_partition
+
+
+DEFAULT_PANEL_STORE = "data/dummy/uc_panel"
+
+# Replica k of UC u gets the code u * MAX_REPLICAS + k
+MAX_REPLICAS = 1000
+
+
+# Mean T&D loss by province (share of units received)
+PROVINCE_LOSS = {
+    "Punjab": 0.12,
+    "Sindh": 0.24,
+    "Khyber Pakhtunkhwa": 0.30,
+    "Balochistan": 0.33,
+}
+
+CSV_COLUMNS = ["month", "uc", "PROVINCE", "DISTRICT", "TEHSIL"] + FILE_SCHEMA.names[3:]
+
+
+def load_uc_attributes(geojson_dir: str, replicas: int = 1) -> pd.DataFrame:
+    """
+    Load one row of attributes per UC from the boundary files.
+
+    Multi-part UCs are merged (areas summed). With ``replicas > 1`` every UC
+    is repeated with synthetic codes ``uc * 1000 + k`` to scale the panel,
+    so at most ``MAX_REPLICAS`` copies keep the codes unique.
+
+    Args:
+        geojson_dir: Directory holding the union_councils_*.geojson files
+        replicas: Copies of each UC to generate
+
+    Returns:
+        DataFrame with uc, PROVINCE, DISTRICT, TEHSIL, area_km2 and lat,
+        sorted by province
+    """
+    files = sorted(glob.glob(str(Path(geojson_dir) / "union_councils_*.geojson")))
+    if not files:
+        raise FileNotFoundError(f"No union_councils_*.geojson files in {geojson_dir}")
+
+    gdf = pd.concat([gpd.read_file(f) for f in files], ignore_index=True)
+    geoms = gdf.geometry.values
+    lat = shapely.get_y(shapely.centroid(geoms))
+    # Degrees^2 -> km^2 with a latitude correction; plenty for a size proxy
+    gdf["area_km2"] = shapely.area(geoms) * 111.32 ** 2 * np.cos(np.radians(lat))
+    gdf["lat"] = lat
+
+    ucs = (
+        gdf.groupby("UC_C", sort=False)
+        .agg(PROVINCE=("PROVINCE", "first"), DISTRICT=("DISTRICT", "first"),
+             TEHSIL=("TEHSIL", "first"), area_km2=("area_km2", "sum"), lat=("lat", "first"))
+        .reset_index()
+        .rename(columns={"UC_C": "uc"})
+    )
+    ucs["TEHSIL"] = ucs["TEHSIL"].fillna("")
+
+    if replicas > 1:
+        ucs = ucs.loc[ucs.index.repeat(replicas)].reset_index(drop=True)
+        ucs["uc"] = ucs["uc"].astype(np.int64) * MAX_REPLICAS + np.tile(np.arange(replicas), len(ucs) // replicas)
+
+    return ucs.sort_values(["PROVINCE", "uc"], kind="stable").reset_index(drop=True)
+
+
+def draw_uc_effects(ucs: pd.DataFrame, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """
+    Draw the per-UC effects shared by every month.
+
+    Args:
+        ucs: UC attributes from ``load_uc_attributes``
+        rng: Random generator
+
+    Returns:
+        Dictionary of per-UC arrays
+    """
+    n = len(ucs)
+    area = np.clip(ucs["area_km2"].to_numpy(), 1, None)
+    base_loss = ucs["PROVINCE"].map(PROVINCE_LOSS).fillna(0.2).to_numpy()
+
+    loss = base_loss + rng.normal(0, 0.06, n)
+    return {
+        "base_units": rng.lognormal(np.log(350_000), 0.5, n) * (area / np.median(area)) ** 0.15,
+        "loss": loss,
+        "tariff": rng.normal(48, 5, n),
+        # Recovery falls as losses rise above the provincial baseline
+        "recovery": 0.93 - 0.8 * (loss - base_loss) - 0.3 * (base_loss - 0.12) + rng.normal(0, 0.04, n),
+        # Stronger summer peak further south
+        "seasonality": 0.15 + 0.01 * (37 - ucs["lat"].to_numpy()),
+    }
+
+
+def generate_month(
+    effects: Dict[str, np.ndarray], month: pd.Period, rng: np.random.Generator
+) -> Dict[str, np.ndarray]:
+    """
+    Generate one month of volumes and derived rates for every UC.
+
+    Args:
+        effects: Per-UC effects from ``draw_uc_effects``
+        month: Month being generated
+        rng: Random generator for this month
+
+    Returns:
+        Dictionary of column arrays following ``FILE_SCHEMA`` (minus keys)
+    """
+    n = len(effects["base_units"])
+    season = 1 + effects["seasonality"] * np.sin(2 * np.pi * (month.month - 4) / 12)
+
+    received = np.round(effects["base_units"] * season * rng.lognormal(0, 0.08, n))
+    loss = np.clip(effects["loss"] + rng.normal(0, 0.03, n), -0.05, 0.85)
+    billed = np.round(received * (1 - loss))
+    assessment = np.round(billed * effects["tariff"] * rng.normal(1, 0.02, n))
+    recovery = np.clip(effects["recovery"] + rng.normal(0, 0.05, n), 0.3, 1.2)
+    payment = np.round(assessment * recovery)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        td_loss = np.where(received > 0, (received - billed) / received, 0.0)
+        recovery_loss = np.where(assessment > 0, (assessment - payment) / assessment, 0.0)
+
+    return {
+        "mth_unit_recieved_dummy": received,
+        "mth_unit_billed_dummy": billed,
+        "assessment_dummy": assessment,
+        "payment_dummy": payment,
+        "td_loss_dummy": td_loss,
+        "recovery_loss_dummy": recovery_loss,
+    }
+
+
+def generate_panel(
+    geojson_dir: str = "data/geo/geojson",
+    start_month: str = "2022-01",
+    months: int = 36,
+    replicas: int = 1,
+    store: Optional[str] = DEFAULT_PANEL_STORE,
+    csv_path: Optional[str] = None,
+    seed: int = 42,
+) -> int:
+    """
+    Generate the panel month by month and write it out.
+
+    Args:
+        geojson_dir: Directory holding the union_councils_*.geojson files
+        start_month: First month (``YYYY-MM``)
+        months: Number of months
+        replicas: Copies of each UC (scales the row count)
+        store: Partitioned store directory (None to skip); must not be the
+            ingested store
+        csv_path: Optional ``dummy_data.csv``-style CSV output
+        seed: Root random seed
+
+    Returns:
+        Number of rows generated
+    """
+    if not 1 <= replicas <= MAX_REPLICAS:
+        raise ValueError(f"replicas must be between 1 and {MAX_REPLICAS}, got {replicas}")
+    if store and Path(store).resolve() == Path(DEFAULT_STORE).resolve():
+        raise ValueError(
+            f"{store} is the ingested store; write the panel to a separate store"
+        )
+    if store and (Path(store) / AGGREGATES_DIR).exists():
+        # Aggregates of an earlier panel would describe the old rows
+        shutil.rmtree(Path(store) / AGGREGATES_DIR)
+        print(f"Dropped stale running aggregates in {store}")
+
+    ucs = load_uc_attributes(geojson_dir, replicas)
+    seeds = np.random.SeedSequence(seed).spawn(months + 1)
+    effects = draw_uc_effects(ucs, np.random.default_rng(seeds[0]))
+    print(f"Generating {len(ucs):,} UCs x {months} months = {len(ucs) * months:,} rows")
+
+    # Static columns as Arrow arrays, sliced per province and reused every month
+    static = {
+        "uc": pa.array(ucs["uc"].to_numpy(dtype=np.int64)),
+        "PROVINCE": pa.array(ucs["PROVINCE"].to_numpy(dtype=object), pa.string()),
+        "DISTRICT": pa.array(ucs["DISTRICT"].to_numpy(dtype=object), pa.string()),
+        "TEHSIL": pa.array(ucs["TEHSIL"].to_numpy(dtype=object), pa.string()),
+    }
+    bounds = np.flatnonzero(np.r_[True, ucs["PROVINCE"].to_numpy()[1:] != ucs["PROVINCE"].to_numpy()[:-1], True])
+    province_slices = [
+        (ucs["PROVINCE"].iat[start], start, end) for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+
+    csv_writer, csv_schema = None, None
+    if csv_path:
+        Path(csv_path).parent.mkdir(parents=True, exist_ok=True)
+        csv_schema = pa.schema([("month", pa.string())] + [
+            (name, pa.string() if name in ("PROVINCE", "DISTRICT", "TEHSIL") else FILE_SCHEMA.field(name).type)
+            for name in CSV_COLUMNS[1:]
+        ])
+        csv_writer = pv.CSVWriter(csv_path, csv_schema)
+
+    period = pd.Period(start_month, freq="M")
+    rows = 0
+    try:
+        for offset in range(months):
+            month = period + offset
+            columns = generate_month(effects, month, np.random.default_rng(seeds[offset + 1]))
+            table = pa.table({**static, **{name: pa.array(values) for name, values in columns.items()}})
+
+            if store:
+                for province, start, end in province_slices:
+                    path = partition_dir(store, province, str(month)) / "part-0.parquet"
+                    write_partition(table.slice(start, end - start), path)
+
+            if csv_writer is not None:
+                label = pa.array([month.strftime("%y-%b")] * table.num_rows, pa.string())
+                csv_writer.write_table(
+                    table.append_column("month", label).select(CSV_COLUMNS).cast(csv_schema)
+                )
+
+            rows += table.num_rows
+            print(f"  {month}: {table.num_rows:,} rows")
+    finally:
+        if csv_writer is not None:
+            csv_writer.close()
+
+    return rows
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Generate the national UC monthly panel for load testing"
+    )
+    parser.add_argument("--geojson-dir", type=str, default="data/geo/geojson",
+                        help="Directory with union_councils_*.geojson (default: data/geo/geojson)")
+    parser.add_argument("--start-month", type=str, default="2022-01",
+                        help="First month, YYYY-MM (default: 2022-01)")
+    parser.add_argument("--months", type=int, default=36,
+                        help="Number of months (default: 36)")
+    parser.add_argument("--replicas", type=int, default=1,
+                        help=f"Copies of each UC to scale the panel, at most {MAX_REPLICAS} (default: 1)")
+    parser.add_argument("--store", type=str, default=DEFAULT_PANEL_STORE,
+                        help=f"Partitioned store directory, not the ingested store (default: {DEFAULT_PANEL_STORE})")
+    parser.add_argument("--no-store", action="store_true",
+                        help="Do not write the partitioned store")
+    parser.add_argument("--csv", type=str, default=None,
+                        help="Optional CSV output, e.g. data/dummy/dummy_data.csv")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="Random seed (default: 42)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        rows = generate_panel(
+            geojson_dir=args.geojson_dir,
+            start_month=args.start_month,
+            months=args.months,
+            replicas=args.replicas,
+            store=None if args.no_store else args.store,
+            csv_path=args.csv,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"\n✅ Generated {rows:,} rows in {time.perf_counter() - start:.1f}s")
+    if not args.no_store:
+        print(f"Run ingest_uc_month.py --store {args.store} --rebuild to build running aggregates")
+
+
+if __name__ == "__main__":
+    main()
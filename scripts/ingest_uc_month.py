@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+"""
+Incrementally ingest one month of UC billing data.
+
+Each monthly extract is validated, appended to a partitioned store
+(``PROVINCE=<name>/month=<YYYY-MM>/part-0.parquet``) and folded into running
+aggregates at the UC, district and province levels. Each month's aggregate
+rows (monthly totals, cumulative totals and moving-average loss/recovery
+rates) are written as their own file, ``_aggregates/<level>/<YYYY-MM>.csv``.
+They are computed from a small per-level state file holding each key's
+cumulative totals and its last ``window - 1`` monthly sums, so neither raw
+data nor aggregate rows of earlier months are re-read. Mergeable quantile
+sketches of the loss rates (quantile_sketches.py) are updated alongside them.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from quantile_sketches import DEFAULT_METRICS, SketchSet
+from uc_dataset import open_dataset, partition_dir, write_partition
+from validate_data import UC_RULES, validate_frame
+
+
+# Columns every extract must carry (geometry is optional and not stored; UC
+# shapes live in the union_councils_*.geojson files).
+KEY_COLUMNS = ["month", "uc", "PROVINCE", "DISTRICT", "TEHSIL"]
+VOLUME_COLUMNS = [
+    "mth_unit_recieved_dummy",
+    "mth_unit_billed_dummy",
+    "assessment_dummy",
+    "payment_dummy",
+]
+REQUIRED_COLUMNS = KEY_COLUMNS + VOLUME_COLUMNS
+
+# Grouping keys for each aggregate level
+LEVELS = {
+    "uc": ["PROVINCE", "DISTRICT", "uc"],
+    "district": ["PROVINCE", "DISTRICT"],
+    "province": ["PROVINCE"],
+}
+
+AGGREGATES_DIR = "_aggregates"
+SKETCHES_DIR = "sketches"
+# Ingested months and window; written last, so it is the commit point
+STATE_FILE = "state.json"
+PENDING_SUFFIX = ".pending-"
+
+
+def parse_month(values: pd.Series) -> pd.Series:
+    """
+    Parse extract month labels (e.g. ``24-Feb``) into ``YYYY-MM`` keys.
+
+    Args:
+        values: Series of month labels in ``YY-Mon`` form
+
+    Returns:
+        Series of ``YYYY-MM`` strings
+    """
+    parsed = pd.to_datetime(values, format="%y-%b", errors="coerce")
+    if parsed.isna().any():
+        bad = values[parsed.isna()].unique()[:5]
+        raise ValueError(f"Unparseable month labels: {list(bad)}")
+    return parsed.dt.strftime("%Y-%m")
+
+
+def validate_extract(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Validate a single-month extract and return a cleaned copy.
+
+    Checks required columns, non-null keys, numeric volumes, a single month
+    and one row per UC. Derived loss/recovery rates are recomputed from the volumes.
+
+    Args:
+        df: Raw extract as read from CSV
+
+    Returns:
+        Cleaned DataFrame with an added ``month_key`` column
+    """
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Extract is missing required columns: {missing}")
+
+    df = df[REQUIRED_COLUMNS].copy()
+
+    # Null keys would be dropped by the per-level groupbys, leaving levels
+    # that disagree on totals
+    null_keys = {col: int(df[col].isna().sum()) for col in KEY_COLUMNS if df[col].isna().any()}
+    if null_keys:
+        raise ValueError(f"Extract has null key values (column: rows): {null_keys}")
+
+    for col in VOLUME_COLUMNS:
+        values = pd.to_numeric(df[col], errors="coerce")
+        bad_rows = values.isna() & df[col].notna()
+        if bad_rows.any():
+            raise ValueError(
+                f"Column '{col}' has non-numeric values at rows "
+                f"{list(np.flatnonzero(bad_rows)[:10])}"
+            )
+        if (values < 0).any():
+            raise ValueError(f"Column '{col}' has negative values")
+        df[col] = values.fillna(0.0).astype("float64")
+
+    df["uc"] = pd.to_numeric(df["uc"], errors="raise").astype("int64")
+    df["month_key"] = parse_month(df["month"])
+
+    months = df["month_key"].unique()
+    if len(months) != 1:
+        raise ValueError(
+            f"Extract must contain exactly one month, found {sorted(months)}"
+        )
+
+    duplicated = df["uc"].duplicated()
+    if duplicated.any():
+        raise ValueError(
+            f"Extract has duplicate rows for UCs {df.loc[duplicated, 'uc'].unique()[:10].tolist()}"
+        )
+
+    received = df["mth_unit_recieved_dummy"]
+    assessment = df["assessment_dummy"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["td_loss_dummy"] = np.where(
+            received > 0, (received - df["mth_unit_billed_dummy"]) / received, 0.0
+        )
+        df["recovery_loss_dummy"] = np.where(
+            assessment > 0, (assessment - df["payment_dummy"]) / assessment, 0.0
+        )
+
+    return df
+
+
+def _meta_path(store: Path) -> Path:
+    return store / AGGREGATES_DIR / STATE_FILE
+
+
+def load_meta(store: Path) -> Dict:
+    """
+    Load the committed ingest metadata (ingested months and window).
+
+    Args:
+        store: Root directory of the partitioned store
+
+    Returns:
+        Dictionary with ``months`` (sorted ``YYYY-MM`` keys) and ``window``
+    """
+    path = _meta_path(store)
+    if not path.exists():
+        return {"months": [], "window": None}
+    with open(path) as f:
+        return json.load(f)
+
+
+def ingested_months(store: Path) -> List[str]:
+    """
+    List the months already committed to the store, in order.
+
+    A month counts as ingested only once every aggregate level and the
+    sketches have been written for it.
+
+    Args:
+        store: Root directory of the partitioned store
+
+    Returns:
+        Sorted list of ``YYYY-MM`` keys
+    """
+    return load_meta(Path(store))["months"]
+
+
+def _pending(path: Path, month_key: str) -> Path:
+    """Staging name for a file that becomes visible when ``month_key`` commits."""
+    return path.with_name(f"{path.name}{PENDING_SUFFIX}{month_key}")
+
+
+def _write_atomic(path: Path, write):
+    """Write via a temporary file and rename into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def recover_pending(store: Path):
+    """
+    Finish or discard files staged by an interrupted ingest.
+
+    Staged files for a month recorded in the metadata are promoted (the
+    ingest committed but did not finish renaming); others are deleted.
+
+    Args:
+        store: Root directory of the partitioned store
+    """
+    aggregates_dir = store / AGGREGATES_DIR
+    if not aggregates_dir.exists():
+        return
+    committed = set(load_meta(store)["months"])
+    for staged in aggregates_dir.rglob(f"*{PENDING_SUFFIX}*"):
+        final_name, month_key = staged.name.split(PENDING_SUFFIX, 1)
+        if month_key in committed:
+            os.replace(staged, staged.with_name(final_name))
+        else:
+            staged.unlink()
+
+
+def _commit(store: Path, meta: Dict, staged: List[Path], month_key: str):
+    """Record ``month_key`` as ingested, then promote its staged files."""
+    _write_atomic(_meta_path(store), lambda p: p.write_text(json.dumps(meta, indent=2) + "\n"))
+    suffix = f"{PENDING_SUFFIX}{month_key}"
+    for path in staged:
+        os.replace(path, path.with_name(path.name[:-len(suffix)]))
+
+
+def write_partitions(df: pd.DataFrame, store: Path, month_key: str) -> int:
+    """
+    Write one month of rows into per-province partitions.
+
+    Args:
+        df: Validated extract
+        store: Root directory of the partitioned store
+        month_key: ``YYYY-MM`` key for the month being written
+
+    Returns:
+        Number of partition files written
+    """
+    written = 0
+    for province, group in df.groupby("PROVINCE", sort=True):
+        # PROVINCE and month are carried by the partition path
+        table = pa.Table.from_pandas(group, preserve_index=False)
+        write_partition(table, partition_dir(store, province, month_key) / "part-0.parquet")
+        written += 1
+    return written
+
+
+def _loss_rates(received, billed, assessment, payment):
+    """Volume-weighted T&D loss and recovery-loss rates."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        td_loss = np.where(received > 0, 1 - billed / received, 0.0)
+        recovery_loss = np.where(assessment > 0, 1 - payment / assessment, 0.0)
+    return td_loss, recovery_loss
+
+
+def _lag_columns(window: int) -> List[List[str]]:
+    """State columns for the monthly sums of the last ``window - 1`` months."""
+    return [[f"m{lag}_{col}" for col in VOLUME_COLUMNS] for lag in range(window - 1)]
+
+
+def load_level_state(store: Path, level: str) -> Optional[pd.DataFrame]:
+    """
+    Load the running state for an admin level.
+
+    The state holds one row per key: cumulative totals (``cum_*``) and the
+    monthly sums of the latest ``window - 1`` months (``m0_*`` is the latest
+    ingested month, ``m1_*`` the month before, ...).
+
+    Args:
+        store: Root directory of the partitioned store
+        level: One of ``LEVELS``
+
+    Returns:
+        State DataFrame, or None before the first month
+    """
+    path = store / AGGREGATES_DIR / f"{level}_state.parquet"
+    if not path.exists():
+        return None
+    return pd.read_parquet(path)
+
+
+def update_level_aggregate(
+    df: pd.DataFrame,
+    state: Optional[pd.DataFrame],
+    level: str,
+    month_key: str,
+    as_of: Optional[str],
+    window: int,
+):
+    """
+    Fold one month into the running state for an admin level.
+
+    Only the small per-key state is consulted, never earlier months'
+    aggregate rows, so the cost depends on the number of keys rather than
+    the length of the history.
+
+    Args:
+        df: Validated extract
+        state: State from ``load_level_state`` (None before the first month)
+        level: One of ``LEVELS``
+        month_key: ``YYYY-MM`` key for the month being added
+        as_of: Latest month already folded into ``state``
+        window: Moving-average window in months
+
+    Returns:
+        Tuple of (aggregate rows for this month, new state)
+    """
+    keys = LEVELS[level]
+    cum_columns = [f"cum_{col}" for col in VOLUME_COLUMNS]
+    lag_columns = _lag_columns(window)
+
+    current = df.groupby(keys, as_index=False)[VOLUME_COLUMNS].sum()
+
+    if state is None:
+        state = current[keys].iloc[:0]
+    # Keys seen before but absent this month keep their totals
+    merged = current.merge(state, on=keys, how="outer", indicator=True)
+    for col in VOLUME_COLUMNS + cum_columns + sum(lag_columns, []):
+        merged[col] = merged[col].fillna(0.0) if col in merged else 0.0
+    merged = merged.sort_values(keys, kind="stable").reset_index(drop=True)
+    present = merged["_merge"].ne("right_only").to_numpy()
+    volumes = merged[VOLUME_COLUMNS].to_numpy(dtype=np.float64)
+
+    # Months between the state and this month shift the lag slots: slot i of
+    # the state is month as_of - i, i.e. this month minus (gap + i)
+    gap = (pd.Period(month_key, freq="M") - pd.Period(as_of, freq="M")).n if as_of else window
+    lags = np.stack([merged[cols].to_numpy(dtype=np.float64) for cols in lag_columns], axis=1) \
+        if lag_columns else np.zeros((len(merged), 0, len(VOLUME_COLUMNS)))
+    previous = np.zeros_like(lags)
+    if gap <= lags.shape[1]:
+        # previous[:, j] holds month_key - (j + 1)
+        previous[:, gap - 1:] = lags[:, :lags.shape[1] - gap + 1]
+    window_sums = volumes + previous.sum(axis=1)
+
+    cumulative = merged[cum_columns].to_numpy(dtype=np.float64) + volumes
+
+    new_state = merged[keys].copy()
+    new_state[cum_columns] = cumulative
+    shifted = np.concatenate([volumes[:, None, :], previous[:, :-1]], axis=1)[:, :len(lag_columns)]
+    for lag, cols in enumerate(lag_columns):
+        new_state[cols] = shifted[:, lag]
+
+    # This month's rows cover the keys present in the extract
+    rows = merged.loc[present, keys + VOLUME_COLUMNS].reset_index(drop=True)
+    rows.insert(len(keys), "month", month_key)
+    rows[cum_columns] = cumulative[present]
+    received, billed, assessment, payment = volumes[present].T
+    rows["td_loss"], rows["recovery_loss"] = _loss_rates(received, billed, assessment, payment)
+    rows[f"td_loss_ma{window}"], rows[f"recovery_loss_ma{window}"] = _loss_rates(
+        *window_sums[present].T
+    )
+    return rows, new_state
+
+
+def _stage_month(store: Path, month_key: str, results: Dict[str, tuple], sketches: SketchSet) -> List[Path]:
+    """Write a month's aggregate partitions, level states and sketches as pending files."""
+    aggregates_dir = store / AGGREGATES_DIR
+    staged = []
+    for level, (rows, state) in results.items():
+        month_path = _pending(aggregates_dir / level / f"{month_key}.csv", month_key)
+        month_path.parent.mkdir(parents=True, exist_ok=True)
+        rows.to_csv(month_path, index=False)
+        state_path = _pending(aggregates_dir / f"{level}_state.parquet", month_key)
+        state.to_parquet(state_path, index=False)
+        staged += [month_path, state_path]
+    sketch_path = _pending(aggregates_dir / SKETCHES_DIR / f"{month_key}.json", month_key)
+    sketches.save(sketch_path)
+    staged.append(sketch_path)
+    return staged
+
+
+def load_sketches(store: str) -> SketchSet:
+    """
+    Load and merge the quantile sketches of every committed month.
+
+    Sketches are keyed by month, so each month's set is written once as
+    ``_aggregates/sketches/<YYYY-MM>.json`` and never rewritten.
+
+    Args:
+        store: Root directory of the partitioned store
+
+    Returns:
+        Merged SketchSet (empty before the first month)
+    """
+    store = Path(store)
+    sketches = SketchSet(DEFAULT_METRICS)
+    for month in ingested_months(store):
+        sketches.merge(SketchSet.load(store / AGGREGATES_DIR / SKETCHES_DIR / f"{month}.json"))
+    return sketches
+
+
+def load_level_aggregate(store: str, level: str) -> pd.DataFrame:
+    """
+    Read every committed month of aggregate rows for a level.
+
+    Args:
+        store: Root directory of the partitioned store
+        level: One of ``LEVELS``
+
+    Returns:
+        DataFrame of aggregate rows, ordered by month
+    """
+    store = Path(store)
+    months = ingested_months(store)
+    frames = [
+        pd.read_csv(store / AGGREGATES_DIR / level / f"{month}.csv", dtype={"month": str})
+        for month in months
+    ]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def ingest_month(
+    df: pd.DataFrame, store: str, window: int = 3
+) -> Dict[str, pd.DataFrame]:
+    """
+    Validate and append one month of UC data to the store.
+
+    All aggregate outputs are staged first and the month is recorded in the
+    metadata only after every level and the sketches are written, so a
+    failure part-way leaves the committed aggregates untouched and the month
+    can simply be retried.
+
+    Args:
+        df: Raw single-month extract
+        store: Root directory of the partitioned store
+        window: Moving-average window in months (default: 3)
+
+    Returns:
+        Dictionary of the aggregate rows added, keyed by level
+    """
+    store = Path(store)
+    recover_pending(store)
+
+    failed = {name: rows for name, rows in validate_frame(df, UC_RULES).items() if len(rows)}
+    if failed:
+        details = "; ".join(f"{name} ({len(rows)} rows)" for name, rows in failed.items())
+        raise ValueError(f"Extract failed validation: {details}")
+
+    df = validate_extract(df)
+    month_key = df["month_key"].iloc[0]
+
+    meta = load_meta(store)
+    existing = meta["months"]
+    if existing and month_key <= existing[-1]:
+        raise ValueError(
+            f"Month {month_key} is not after the latest ingested month "
+            f"{existing[-1]}; the store is append-only"
+        )
+    if existing and meta["window"] != window:
+        raise ValueError(
+            f"Store aggregates use a {meta['window']}-month window; "
+            f"run with --rebuild to switch to {window}"
+        )
+
+    written = write_partitions(df, store, month_key)
+    print(f"  {month_key}: {len(df)} rows -> {written} partitions")
+
+    as_of = existing[-1] if existing else None
+    results = {
+        level: update_level_aggregate(df, load_level_state(store, level), level, month_key, as_of, window)
+        for level in LEVELS
+    }
+    sketches = SketchSet(DEFAULT_METRICS)
+    sketches.update(df, month_column="month_key")
+
+    staged = _stage_month(store, month_key, results, sketches)
+    _commit(store, {"months": existing + [month_key], "window": window}, staged, month_key)
+    return {level: rows for level, (rows, _) in results.items()}
+
+
+def rebuild_aggregates(store: str, window: int = 3) -> List[str]:
+    """
+    Recompute running aggregates from every month in the store.
+
+    Used after a bulk conversion (uc_dataset.py convert) or a window change;
+    reads each month once, in order, carrying the level states and sketches
+    in memory.
+
+    Args:
+        store: Root directory of the partitioned store
+        window: Moving-average window in months (default: 3)
+
+    Returns:
+        Sorted list of months folded into the aggregates
+    """
+    store = Path(store)
+    aggregates_dir = store / AGGREGATES_DIR
+    if aggregates_dir.exists():
+        shutil.rmtree(aggregates_dir)
+
+    dataset = open_dataset(store)
+    columns = ["PROVINCE", "DISTRICT", "uc"] + VOLUME_COLUMNS + DEFAULT_METRICS
+    months = sorted(set(
+        pc.unique(dataset.to_table(columns=["month"])["month"]).to_pylist()
+    ))
+
+    states = {level: None for level in LEVELS}
+    as_of = None
+    for month_key in months:
+        df = dataset.to_table(
+            columns=columns, filter=ds.field("month") == month_key
+        ).to_pandas()
+        for level in LEVELS:
+            rows, states[level] = update_level_aggregate(df, states[level], level, month_key, as_of, window)
+            month_path = aggregates_dir / level / f"{month_key}.csv"
+            month_path.parent.mkdir(parents=True, exist_ok=True)
+            rows.to_csv(month_path, index=False)
+        df["month_key"] = month_key
+        sketches = SketchSet(DEFAULT_METRICS)
+        sketches.update(df, month_column="month_key")
+        sketches.save(aggregates_dir / SKETCHES_DIR / f"{month_key}.json")
+        as_of = month_key
+        print(f"  {month_key}: {len(df)} rows folded")
+
+    if months:
+        for level, state in states.items():
+            state.to_parquet(aggregates_dir / f"{level}_state.parquet", index=False)
+        _write_atomic(_meta_path(store), lambda p: p.write_text(
+            json.dumps({"months": months, "window": window}, indent=2) + "\n"
+        ))
+    return months
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Append monthly UC extracts to the partitioned store"
+    )
+    parser.add_argument(
+        "extracts",
+        nargs="*",
+        help="CSV extracts, each holding a single month (processed in order)",
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        default="data/dummy/uc_monthly",
+        help="Partitioned store directory (default: data/dummy/uc_monthly)",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=3,
+        help="Moving-average window in months (default: 3)",
+    )
+    parser.add_argument(
+        "--split-months",
+        action="store_true",
+        help="Split multi-month files and ingest each month chronologically "
+        "(useful to seed the store from history)",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Recompute running aggregates from all months already in the store",
+    )
+    args = parser.parse_args()
+
+    if args.rebuild:
+        print(f"Rebuilding aggregates in {args.store}...")
+        rebuild_aggregates(args.store, window=args.window)
+
+    failed = []
+    for extract in args.extracts:
+        print(f"Reading {extract}...")
+        df = pd.read_csv(extract)
+
+        try:
+            if args.split_months:
+                month_keys = parse_month(df["month"])
+                batches = [group for _, group in df.groupby(month_keys, sort=True)]
+            else:
+                batches = [df]
+
+            # Stop at the first rejected month so later ones are not appended
+            # past a gap
+            for batch in batches:
+                ingest_month(batch, args.store, window=args.window)
+        except ValueError as e:
+            print(f"❌ Rejected {extract}: {e}")
+            failed.append(extract)
+
+    months = ingested_months(Path(args.store))
+    status = "❌" if failed else "✅"
+    print(f"\n{status} Store holds {len(months)} months ({months[0] if months else '-'} to {months[-1] if months else '-'})")
+    if failed:
+        print(f"{len(failed)} extract(s) rejected: {', '.join(failed)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Monte Carlo Laffer-curve scenario engine for the tax dashboards.
+
+generate_tax_data.generate_fbr_tax_data produces a single random path through
+the tax-rate -> reported-income dynamics. This script runs many seeded paths
+as batched NumPy arrays (one array axis per path), with a configurable
+salaried tax-rate schedule and a prior on the rate elasticity of reported
+income, spreads batches across cores and reduces them into percentile bands
+per fiscal year and quarter.
+
+Incomes and taxes are drawn as in generate_fbr_tax_data, but the Laffer
+response is a new parameterization. Instead of that script's fixed
+``max(0.3, 1 - 0.08 * year_idx)`` decay, reported income responds to rates as
+    laffer_effect = max(floor, (rate / base_year_rate) ** -elasticity)
+with the elasticity drawn per path from a truncated normal prior.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from generate_tax_data import FISCAL_YEARS, QUARTERS
+
+
+# Default salaried rate schedule: 15% rising 1.5 points per fiscal year
+DEFAULT_RATE_SCHEDULE = [15 + 1.5 * i for i in range(len(FISCAL_YEARS))]
+
+METRICS = [
+    'salaried_tax_rate_percent',
+    'salaried_reported_income_billion',
+    'salaried_tax_billion',
+    'income_tax_billion',
+    'laffer_effect',
+    'elasticity',
+    'salaried_burden_percent',
+]
+
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+def truncated_normal(rng: np.random.Generator, mean: float, sd: float, size: int,
+                     max_rounds: int = 1000) -> np.ndarray:
+    """
+    Draw from a normal distribution truncated to non-negative values.
+
+    Negative draws are redrawn (not clipped), so no mass piles up at 0.
+
+    Args:
+        rng: NumPy random generator
+        mean: Mean of the untruncated normal
+        sd: Standard deviation of the untruncated normal
+        size: Number of draws
+        max_rounds: Redraw rounds before giving up
+
+    Returns:
+        Array of ``size`` non-negative draws
+    """
+    values = rng.normal(mean, sd, size)
+    for _ in range(max_rounds):
+        negative = np.flatnonzero(values < 0)
+        if len(negative) == 0:
+            return values
+        values[negative] = rng.normal(mean, sd, len(negative))
+    raise ValueError(
+        f"Elasticity prior N({mean}, {sd}) has too little mass above 0 to sample"
+    )
+
+
+def simulate_paths(
+    rng: np.random.Generator,
+    n_paths: int,
+    rate_schedule: Sequence[float],
+    elasticity_mean: float = 1.4,
+    elasticity_sd: float = 0.3,
+    laffer_floor: float = 0.3,
+) -> Dict[str, np.ndarray]:
+    """
+    Simulate a batch of tax paths.
+
+    Every array has shape (n_paths, n_years, n_quarters). Incomes and the
+    corporate, business and capital-gains taxes are drawn as in
+    generate_fbr_tax_data; the Laffer response is a new parameterization,
+    ``max(laffer_floor, (rate / base_rate) ** -elasticity)`` with the
+    elasticity drawn per path, rather than that script's fixed
+    ``max(0.3, 1 - 0.08 * year_idx)`` decay.
+
+    Args:
+        rng: NumPy random generator for this batch
+        n_paths: Number of paths to simulate
+        rate_schedule: Salaried tax rate (percent) for each fiscal year
+        elasticity_mean: Mean of the elasticity prior (before truncation at 0)
+        elasticity_sd: Standard deviation of the elasticity prior (before
+            truncation at 0)
+        laffer_floor: Lower bound on the Laffer effect
+
+    Returns:
+        Dictionary mapping each metric in METRICS to its array
+    """
+    n_years, n_quarters = len(rate_schedule), len(QUARTERS)
+    shape = (n_paths, n_years, n_quarters)
+
+    year_idx = np.arange(n_years)[None, :, None]
+    quarter_idx = np.arange(n_quarters)[None, None, :]
+    scale = (1 + year_idx * 0.15) * (1 + quarter_idx * 0.05)
+
+    salaried_income = (150 + rng.uniform(-20, 30, shape)) * scale
+    salaried_rate = np.asarray(rate_schedule, dtype=np.float64)[None, :, None] + rng.uniform(-1, 1, shape)
+    salaried_tax = salaried_income * salaried_rate / 100
+
+    corporate_tax = (300 + rng.uniform(-50, 100, shape)) * scale * (29 + rng.uniform(-1, 2, shape)) / 100
+    business_tax = (200 + rng.uniform(-40, 80, shape)) * scale * (20 + rng.uniform(-2, 3, shape)) / 100
+    capital_gains_tax = (80 + rng.uniform(-20, 40, shape)) * scale * (15 + rng.uniform(-1, 2, shape)) / 100
+    income_tax = salaried_tax + corporate_tax + business_tax + capital_gains_tax
+
+    # Reported income responds to the rate relative to the base fiscal year
+    elasticity_prior = truncated_normal(rng, elasticity_mean, elasticity_sd, n_paths)
+    rate_ratio = salaried_rate / salaried_rate[:, :1, :]
+    laffer_effect = np.maximum(laffer_floor, rate_ratio ** -elasticity_prior[:, None, None])
+    reported_income = salaried_income * laffer_effect
+
+    # Observed elasticity against the same quarter of the previous year
+    elasticity = np.ones(shape)
+    income_change = np.diff(reported_income, axis=1) / reported_income[:, :-1, :]
+    rate_change = np.diff(salaried_rate, axis=1) / salaried_rate[:, :-1, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        observed = np.where(rate_change != 0, income_change / rate_change, 1.0)
+    elasticity[:, 1:, :] = np.clip(observed, 0.3, 1.5)
+
+    return {
+        'salaried_tax_rate_percent': salaried_rate,
+        'salaried_reported_income_billion': reported_income,
+        'salaried_tax_billion': salaried_tax,
+        'income_tax_billion': income_tax,
+        'laffer_effect': laffer_effect,
+        'elasticity': elasticity,
+        'salaried_burden_percent': salaried_tax / income_tax * 100,
+    }
+
+
+def _run_batch(args) -> Dict[str, np.ndarray]:
+    """Worker entry point: simulate one seeded batch as float32 arrays."""
+    seed_sequence, n_paths, kwargs = args
+    paths = simulate_paths(np.random.default_rng(seed_sequence), n_paths, **kwargs)
+    return {metric: values.astype(np.float32) for metric, values in paths.items()}
+
+
+def run_scenarios(
+    n_paths: int = 20000,
+    rate_schedule: Sequence[float] = None,
+    elasticity_mean: float = 1.4,
+    elasticity_sd: float = 0.3,
+    laffer_floor: float = 0.3,
+    seed: int = 42,
+    workers: int = None,
+    batch_size: int = 5000,
+) -> pd.DataFrame:
+    """
+    Run the scenario engine and reduce paths into percentile bands.
+
+    Batches get independent child seeds from one SeedSequence, so results are
+    reproducible for a given seed and batch size regardless of worker count.
+
+    Args:
+        n_paths: Total number of simulated paths
+        rate_schedule: Salaried tax rate per fiscal year (default: 15% + 1.5/yr)
+        elasticity_mean: Mean of the elasticity prior
+        elasticity_sd: Standard deviation of the elasticity prior
+        laffer_floor: Lower bound on the Laffer effect
+        seed: Root random seed
+        workers: Worker processes (default: CPU count; 1 runs in-process)
+        batch_size: Paths per batch
+
+    Returns:
+        Long-format DataFrame with one row per fiscal year, quarter and metric
+    """
+    if rate_schedule is None:
+        rate_schedule = DEFAULT_RATE_SCHEDULE
+    if len(rate_schedule) != len(FISCAL_YEARS):
+        raise ValueError(
+            f"Rate schedule needs {len(FISCAL_YEARS)} values, got {len(rate_schedule)}"
+        )
+
+    kwargs = {
+        'rate_schedule': list(rate_schedule),
+        'elasticity_mean': elasticity_mean,
+        'elasticity_sd': elasticity_sd,
+        'laffer_floor': laffer_floor,
+    }
+    sizes = [batch_size] * (n_paths // batch_size)
+    if n_paths % batch_size:
+        sizes.append(n_paths % batch_size)
+    children = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(child, size, kwargs) for child, size in zip(children, sizes)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        batches = [_run_batch(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            batches = list(pool.map(_run_batch, tasks))
+
+    records = []
+    for metric in METRICS:
+        values = np.concatenate([batch[metric] for batch in batches], axis=0)
+        bands = np.percentile(values, PERCENTILES, axis=0)
+        means = values.mean(axis=0)
+        for year_idx, fiscal_year in enumerate(FISCAL_YEARS):
+            for quarter_idx, quarter in enumerate(QUARTERS):
+                record = {
+                    'fiscal_year': fiscal_year,
+                    'quarter': quarter,
+                    'metric': metric,
+                    'mean': round(float(means[year_idx, quarter_idx]), 4),
+                }
+                for pct, band in zip(PERCENTILES, bands):
+                    record[f'p{pct}'] = round(float(band[year_idx, quarter_idx]), 4)
+                records.append(record)
+
+    return pd.DataFrame(records)
+
+
+def parse_schedule(text: str) -> List[float]:
+    """Parse a comma-separated rate schedule such as ``15,16.5,18``."""
+    return [float(value) for value in text.split(',') if value.strip()]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Monte Carlo Laffer-curve scenarios for the FBR tax model"
+    )
+    parser.add_argument('--paths', type=int, default=20000,
+                        help="Number of simulated paths (default: 20000)")
+    parser.add_argument('--rate-schedule', type=parse_schedule, default=None,
+                        help="Comma-separated salaried rate per fiscal year "
+                             f"({len(FISCAL_YEARS)} values, default: 15%% + 1.5 per year)")
+    parser.add_argument('--elasticity-mean', type=float, default=1.4,
+                        help="Mean of the elasticity prior, a normal truncated at 0 (default: 1.4)")
+    parser.add_argument('--elasticity-sd', type=float, default=0.3,
+                        help="Std. dev. of the elasticity prior before truncation (default: 0.3)")
+    parser.add_argument('--laffer-floor', type=float, default=0.3,
+                        help="Lower bound on the Laffer effect (default: 0.3)")
+    parser.add_argument('--seed', type=int, default=42,
+                        help="Root random seed (default: 42)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument('--output', type=str, default='data/dummy/laffer_scenarios.csv',
+                        help="Output CSV (default: data/dummy/laffer_scenarios.csv)")
+    args = parser.parse_args()
+
+    print(f"Running {args.paths} Laffer-curve scenarios...")
+    start = time.perf_counter()
+    bands = run_scenarios(
+        n_paths=args.paths,
+        rate_schedule=args.rate_schedule,
+        elasticity_mean=args.elasticity_mean,
+        elasticity_sd=args.elasticity_sd,
+        laffer_floor=args.laffer_floor,
+        seed=args.seed,
+        workers=args.workers,
+    )
+    elapsed = time.perf_counter() - start
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    bands.to_csv(args.output, index=False)
+    print(f"✓ Reduced {args.paths} paths into {len(bands)} percentile bands in {elapsed:.2f}s")
+    print(f"✓ Saved to {args.output}")
+
+    print("\n" + "="*60)
+    print("LAFFER EFFECT BANDS (Q1)")
+    print("="*60)
+    summary = bands[(bands['metric'] == 'laffer_effect') & (bands['quarter'] == 'Q1')]
+    print(summary.drop(columns=['metric']).to_string(index=False))
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Mergeable quantile sketches for streaming distribution summaries.
+
+Maintains a KLL sketch per metric, admin level (national, province,
+district) and month while UC data is read chunk by chunk, so percentile
+bands and histogram bins can be computed without holding or sorting the
+full dataset. Sketches for different partitions (months, provinces, files)
+merge into a sketch of their union.
+
+Two outputs are written: the full sketch state (for merging later chunks or
+partitions, including each sketch's RNG state so reloaded sketches compact
+reproducibly) and a compact export of selected percentiles, and optionally
+histogram counts over fixed bin edges, per sketch for the dashboards, which
+replaces sorting raw rows on every redraw.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_METRICS = ["td_loss_dummy", "recovery_loss_dummy"]
+
+# Admin levels and the columns identifying a group at each level
+LEVEL_KEYS = {
+    "national": [],
+    "province": ["PROVINCE"],
+    "district": ["PROVINCE", "DISTRICT"],
+}
+
+EXPORT_PERCENTILES = list(range(0, 101, 5))
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch over floats.
+
+    Items live in a stack of compactors; an item at level ``h`` stands for
+    ``2 ** h`` inputs. When a level exceeds its capacity it is sorted and
+    every other item (random offset) is promoted to the next level. Rank
+    error is roughly ``1.7 / k`` of ``n``.
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        """
+        Args:
+            k: Accuracy parameter (capacity of the top compactor)
+            seed: Seed for the compaction coin flips
+        """
+        self.k = k
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(8, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compact(self, level: int):
+        """Halve one level, promoting every other sorted item."""
+        items = np.sort(self.levels[level])
+        if level + 1 == len(self.levels):
+            self.levels.append(np.empty(0))
+
+        # An odd item out stays behind so weights are preserved exactly
+        leftover = items[:len(items) % 2]
+        pairs = items[len(items) % 2:]
+        offset = int(self._rng.integers(2))
+        self.levels[level + 1] = np.concatenate([self.levels[level + 1], pairs[offset::2]])
+        self.levels[level] = leftover
+
+    def _compress(self):
+        """Compact levels until every level fits its capacity."""
+        while True:
+            for level, items in enumerate(self.levels):
+                if len(items) > self._capacity(level):
+                    self._compact(level)
+                    break
+            else:
+                return
+
+    def update(self, values):
+        """
+        Add a batch of values (NaNs are ignored).
+
+        Args:
+            values: Array-like of numbers
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """
+        Merge another sketch into this one.
+
+        Args:
+            other: Sketch built with the same ``k``
+
+        Returns:
+            This sketch
+        """
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with k={self.k} and k={other.k}")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(level_items), 2.0 ** level) for level, level_items in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs) -> np.ndarray:
+        """
+        Estimate quantiles.
+
+        Args:
+            qs: Array-like of quantiles in [0, 1]
+
+        Returns:
+            Array of estimated values (NaN for an empty sketch)
+        """
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        items, cumulative = self._weighted_items()
+        ranks = qs * cumulative[-1]
+        idx = np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)
+        result = items[idx]
+        # The exact extremes are tracked separately
+        result = np.where(qs <= 0, self.min, result)
+        return np.where(qs >= 1, self.max, result)
+
+    def histogram(self, edges) -> np.ndarray:
+        """
+        Estimate counts between consecutive bin edges.
+
+        Args:
+            edges: Monotonic array of bin edges
+
+        Returns:
+            Estimated count per bin
+        """
+        edges = np.asarray(edges, dtype=np.float64)
+        if self.n == 0:
+            return np.zeros(len(edges) - 1)
+        items, cumulative = self._weighted_items()
+        below = np.concatenate([[0.0], cumulative])[np.searchsorted(items, edges, side="right")]
+        return np.diff(below) * (self.n / cumulative[-1])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the sketch to a JSON-compatible dictionary."""
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": self.min if self.n else None,
+            "max": self.max if self.n else None,
+            "levels": [items.tolist() for items in self.levels],
+            "rng": self._rng.bit_generator.state,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KLLSketch":
+        """Rebuild a sketch from ``to_dict`` output."""
+        sketch = cls(k=data["k"])
+        sketch.n = data["n"]
+        sketch.min = data["min"] if data["min"] is not None else np.inf
+        sketch.max = data["max"] if data["max"] is not None else -np.inf
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in data["levels"]]
+        if data.get("rng") is not None:
+            # Continue the coin flips where the saved sketch left off
+            sketch._rng.bit_generator.state = data["rng"]
+        return sketch
+
+
+class SketchSet:
+    """KLL sketches keyed by (metric, level, group key, month)."""
+
+    def __init__(self, metrics: List[str] = None, k: int = 200, seed: int = 0):
+        """
+        Args:
+            metrics: Columns to summarise (default: DEFAULT_METRICS)
+            k: KLL accuracy parameter
+            seed: Base seed for new sketches
+        """
+        self.metrics = list(metrics or DEFAULT_METRICS)
+        self.k = k
+        self.seed = seed
+        self.sketches: Dict[Tuple[str, str, str, str], KLLSketch] = {}
+
+    def _sketch(self, key: Tuple[str, str, str, str]) -> KLLSketch:
+        if key not in self.sketches:
+            self.sketches[key] = KLLSketch(self.k, seed=self.seed + len(self.sketches))
+        return self.sketches[key]
+
+    def update(self, df: pd.DataFrame, month_column: str = "month"):
+        """
+        Add a chunk of UC rows to every matching sketch.
+
+        Args:
+            df: Chunk with PROVINCE, DISTRICT, month and metric columns
+            month_column: Column holding the month key
+        """
+        for level, keys in LEVEL_KEYS.items():
+            groups = df.groupby(keys + [month_column], sort=False).indices
+            for group, positions in groups.items():
+                group = group if isinstance(group, tuple) else (group,)
+                name = " / ".join(str(part) for part in group[:-1]) or "all"
+                month = str(group[-1])
+                for metric in self.metrics:
+                    values = df[metric].to_numpy()[positions]
+                    self._sketch((metric, level, name, month)).update(values)
+
+    def merge(self, other: "SketchSet") -> "SketchSet":
+        """Merge another sketch set into this one."""
+        for key, sketch in other.sketches.items():
+            if key in self.sketches:
+                self.sketches[key].merge(sketch)
+            else:
+                self.sketches[key] = KLLSketch.from_dict(sketch.to_dict())
+        self.metrics = sorted(set(self.metrics) | set(other.metrics), key=(self.metrics + other.metrics).index)
+        return self
+
+    def save(self, path: str):
+        """Write the full sketch state as JSON."""
+        output_file = Path(path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, "w") as f:
+            json.dump({
+                "k": self.k,
+                "seed": self.seed,
+                "metrics": self.metrics,
+                "sketches": [
+                    {"metric": m, "level": lvl, "key": key, "month": month, **sketch.to_dict()}
+                    for (m, lvl, key, month), sketch in sorted(self.sketches.items())
+                ],
+            }, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "SketchSet":
+        """Load a sketch set written by ``save``."""
+        with open(path) as f:
+            data = json.load(f)
+        sketch_set = cls(metrics=data["metrics"], k=data["k"], seed=data.get("seed", 0))
+        for entry in data["sketches"]:
+            key = (entry["metric"], entry["level"], entry["key"], entry["month"])
+            sketch_set.sketches[key] = KLLSketch.from_dict(entry)
+        return sketch_set
+
+    def export(self, path: str, percentiles: List[int] = None, edges: List[float] = None):
+        """
+        Write percentiles (and optionally histogram counts) per sketch for the dashboards.
+
+        Args:
+            path: Output JSON path
+            percentiles: Percentiles to export (default: every 5th)
+            edges: Histogram bin edges; when given, each summary also gets
+                estimated ``counts`` per bin
+        """
+        percentiles = percentiles or EXPORT_PERCENTILES
+        qs = np.asarray(percentiles) / 100
+        rows = []
+        for (metric, level, key, month), sketch in sorted(self.sketches.items()):
+            values = sketch.quantiles(qs)
+            row = {
+                "metric": metric,
+                "level": level,
+                "key": key,
+                "month": month,
+                "n": sketch.n,
+                "values": [float(f"{value:.6g}") for value in values],
+            }
+            if edges is not None:
+                row["counts"] = [round(float(count), 1) for count in sketch.histogram(edges)]
+            rows.append(row)
+
+        export = {"percentiles": percentiles, "summaries": rows}
+        if edges is not None:
+            export["histogram_edges"] = list(edges)
+
+        output_file = Path(path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, "w") as f:
+            json.dump(export, f, separators=(",", ":"))
+
+
+def sketch_chunks(chunks: Iterable[pd.DataFrame], metrics: List[str] = None, k: int = 200) -> SketchSet:
+    """
+    Build a sketch set from an iterable of DataFrame chunks.
+
+    Args:
+        chunks: DataFrames with PROVINCE, DISTRICT, month and metric columns
+        metrics: Columns to summarise
+        k: KLL accuracy parameter
+
+    Returns:
+        The populated SketchSet
+    """
+    sketch_set = SketchSet(metrics, k)
+    for chunk in chunks:
+        sketch_set.update(chunk)
+    return sketch_set
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Build, merge and export streaming quantile sketches for UC data"
+    )
+    parser.add_argument("--csv", type=str, default=None,
+                        help="UC monthly CSV to sketch (read in chunks)")
+    parser.add_argument("--store", type=str, default=None,
+                        help="Partitioned UC store to sketch (streamed batch by batch)")
+    parser.add_argument("--merge", nargs="*", default=[],
+                        help="Existing sketch files to merge in")
+    parser.add_argument("--metrics", type=str, default=",".join(DEFAULT_METRICS),
+                        help=f"Comma-separated metrics (default: {','.join(DEFAULT_METRICS)})")
+    parser.add_argument("--k", type=int, default=200,
+                        help="KLL accuracy parameter (default: 200)")
+    parser.add_argument("--chunksize", type=int, default=500_000,
+                        help="CSV rows per chunk (default: 500000)")
+    parser.add_argument("--output", type=str, default="data/dummy/uc_sketches.json",
+                        help="Full sketch state output (default: data/dummy/uc_sketches.json)")
+    parser.add_argument("--export", type=str, default=None,
+                        help="Optional dashboard export with percentiles per sketch")
+    parser.add_argument("--histogram-edges", type=str, default=None,
+                        help="Comma-separated bin edges for histogram counts in the export, "
+                        "e.g. 0,0.1,0.2,0.3,0.5,1")
+    args = parser.parse_args()
+
+    edges = None
+    if args.histogram_edges:
+        edges = [float(edge) for edge in args.histogram_edges.split(",")]
+        if len(edges) < 2 or any(b <= a for a, b in zip(edges, edges[1:])):
+            raise ValueError("--histogram-edges needs at least two increasing values")
+
+    metrics = args.metrics.split(",")
+    sketch_set = SketchSet(metrics, args.k)
+
+    if args.csv:
+        print(f"Sketching {args.csv}...")
+        usecols = ["month", "PROVINCE", "DISTRICT"] + metrics
+        for chunk in pd.read_csv(args.csv, usecols=usecols, chunksize=args.chunksize):
+            # Raw ``YY-Mon`` labels -> the store's ``YYYY-MM`` keys
+            chunk["month"] = pd.to_datetime(chunk["month"], format="%y-%b").dt.strftime("%Y-%m")
+            sketch_set.update(chunk)
+
+    if args.store:
+        from uc_dataset import scan_batches
+
+        print(f"Sketching {args.store}...")
+        columns = ["month", "PROVINCE", "DISTRICT"] + metrics
+        for batch in scan_batches(args.store, columns=columns):
+            sketch_set.update(batch.to_pandas())
+
+    for path in args.merge:
+        print(f"Merging {path}...")
+        sketch_set.merge(SketchSet.load(path))
+
+    sketch_set.save(args.output)
+    print(f"Saved {len(sketch_set.sketches)} sketches to {args.output}")
+
+    if args.export:
+        sketch_set.export(args.export, edges=edges)
+        print(f"Saved dashboard export to {args.export}")
+
+
+if __name__ == "__main__":
+    main()
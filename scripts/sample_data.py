@@ -9,6 +9,8 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from data_loader import load_csv
+
 def sample_data_uniform(input_file, output_file, target_rows=1000):
     """
     Sample data to maintain uniform distribution across months and UCs.
@@ -19,9 +21,9 @@ def sample_data_uniform(input_file, output_file, target_rows=1000):
         target_rows (int): Target number of rows to keep (default: 1000)
     """
     
-    # Read the CSV file
+    # Read the CSV file (typed, via the Feather cache)
     print(f"Reading data from {input_file}...")
-    df = pd.read_csv(input_file)
+    df = load_csv(input_file, schema="uc")
     
     print(f"Original dataset has {len(df)} rows")
     
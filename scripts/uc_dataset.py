@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Hive-partitioned Arrow dataset for UC monthly records.
+
+Converts the monolithic UC monthly CSV (``dummy_data.csv``) into a Parquet
+dataset partitioned by ``PROVINCE`` and ``month`` with typed columns and
+per-row-group statistics, and provides a small query API that pushes
+partition filters, row filters and column projection down to the storage.
+Province-month slices only open the matching partition files, and
+full-history aggregations stream record batches instead of loading
+everything into memory.
+
+The layout is shared with ingest_uc_month.py, which appends one month at a
+time to the same store.
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Union
+from urllib.parse import quote
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+DEFAULT_STORE = "data/dummy/uc_monthly"
+
+# Columns stored in each data file (PROVINCE and month live in the path)
+FILE_SCHEMA = pa.schema([
+    ("uc", pa.int64()),
+    ("DISTRICT", pa.string()),
+    ("TEHSIL", pa.string()),
+    ("mth_unit_recieved_dummy", pa.float64()),
+    ("mth_unit_billed_dummy", pa.float64()),
+    ("assessment_dummy", pa.float64()),
+    ("payment_dummy", pa.float64()),
+    ("td_loss_dummy", pa.float64()),
+    ("recovery_loss_dummy", pa.float64()),
+])
+
+PARTITION_SCHEMA = pa.schema([
+    ("PROVINCE", pa.string()),
+    ("month", pa.string()),
+])
+
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+
+ROW_GROUP_SIZE = 64 * 1024
+
+
+def partition_dir(store: Union[str, Path], province: str, month_key: str) -> Path:
+    """
+    Directory holding one province-month partition.
+
+    Args:
+        store: Root directory of the dataset
+        province: Province name
+        month_key: ``YYYY-MM`` month key
+
+    Returns:
+        Path of the partition directory
+    """
+    return Path(store) / f"PROVINCE={quote(str(province), safe='')}" / f"month={month_key}"
+
+
+def write_partition(table: pa.Table, path: Path):
+    """
+    Write one partition file with the dataset's file schema.
+
+    Args:
+        table: Rows for a single province-month (extra columns are dropped)
+        path: Destination ``.parquet`` file
+    """
+    table = table.select(FILE_SCHEMA.names).cast(FILE_SCHEMA)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE, write_statistics=True)
+    tmp_path.replace(path)
+
+
+def _csv_batches(csv_path: str, block_size: int) -> Iterator[pa.RecordBatch]:
+    """Stream typed record batches from the monolithic CSV."""
+    column_types = {field.name: field.type for field in FILE_SCHEMA}
+    column_types.update({"PROVINCE": pa.string(), "month": pa.string()})
+    reader = pv.open_csv(
+        csv_path,
+        read_options=pv.ReadOptions(block_size=block_size),
+        convert_options=pv.ConvertOptions(
+            column_types=column_types,
+            include_columns=list(column_types),
+        ),
+    )
+    for batch in reader:
+        # 24-Feb -> 2024-02 so month partitions sort chronologically
+        month_key = pc.strftime(
+            pc.strptime(batch.column("month"), format="%y-%b", unit="s"),
+            format="%Y-%m",
+        )
+        columns = [batch.column(name) for name in FILE_SCHEMA.names]
+        yield pa.RecordBatch.from_arrays(
+            columns + [batch.column("PROVINCE"), month_key],
+            schema=pa.schema(list(FILE_SCHEMA) + list(PARTITION_SCHEMA)),
+        )
+
+
+def convert_csv(csv_path: str, store: str = DEFAULT_STORE, block_size: int = 16 << 20) -> int:
+    """
+    Convert the UC monthly CSV into the partitioned dataset.
+
+    The CSV is read in blocks, so memory stays bounded regardless of file
+    size. Partitions present in the CSV replace any existing ones.
+
+    Args:
+        csv_path: Path to the UC monthly CSV
+        store: Root directory of the dataset
+        block_size: CSV read block size in bytes
+
+    Returns:
+        Number of rows written
+    """
+    rows = 0
+
+    def counted():
+        nonlocal rows
+        for batch in _csv_batches(csv_path, block_size):
+            rows += batch.num_rows
+            yield batch
+
+    ds.write_dataset(
+        counted(),
+        store,
+        schema=pa.schema(list(FILE_SCHEMA) + list(PARTITION_SCHEMA)),
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="delete_matching",
+        min_rows_per_group=ROW_GROUP_SIZE // 4,
+        max_rows_per_group=ROW_GROUP_SIZE,
+    )
+    return rows
+
+
+def open_dataset(store: str = DEFAULT_STORE) -> ds.Dataset:
+    """
+    Open the partitioned dataset.
+
+    Args:
+        store: Root directory of the dataset
+
+    Returns:
+        A pyarrow Dataset with PROVINCE and month as partition columns
+    """
+    return ds.dataset(
+        store,
+        schema=pa.schema(list(FILE_SCHEMA) + list(PARTITION_SCHEMA)),
+        format="parquet",
+        partitioning=PARTITIONING,
+    )
+
+
+def build_filter(
+    provinces: Optional[Sequence[str]] = None,
+    months: Optional[Sequence[str]] = None,
+    start_month: Optional[str] = None,
+    end_month: Optional[str] = None,
+    extra: Optional[ds.Expression] = None,
+) -> Optional[ds.Expression]:
+    """
+    Build a dataset filter expression.
+
+    Province and month conditions prune whole partitions; ``extra`` conditions
+    on data columns are checked against row-group statistics first.
+
+    Args:
+        provinces: Provinces to keep
+        months: Explicit ``YYYY-MM`` months to keep
+        start_month: Inclusive lower month bound
+        end_month: Inclusive upper month bound
+        extra: Additional expression, e.g. ``ds.field("uc") == 600508``
+
+    Returns:
+        Combined expression, or None for no filtering
+    """
+    conditions = []
+    if provinces:
+        conditions.append(ds.field("PROVINCE").isin(list(provinces)))
+    if months:
+        conditions.append(ds.field("month").isin(list(months)))
+    if start_month:
+        conditions.append(ds.field("month") >= start_month)
+    if end_month:
+        conditions.append(ds.field("month") <= end_month)
+    if extra is not None:
+        conditions.append(extra)
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def query(
+    store: str = DEFAULT_STORE,
+    columns: Optional[List[str]] = None,
+    **filters,
+) -> pa.Table:
+    """
+    Read a filtered, projected slice of the dataset.
+
+    Args:
+        store: Root directory of the dataset
+        columns: Columns to read (default: all)
+        **filters: Keyword arguments for ``build_filter``
+
+    Returns:
+        Arrow table with the matching rows
+    """
+    return open_dataset(store).to_table(columns=columns, filter=build_filter(**filters))
+
+
+def scan_batches(
+    store: str = DEFAULT_STORE,
+    columns: Optional[List[str]] = None,
+    batch_size: int = ROW_GROUP_SIZE,
+    **filters,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Stream record batches for out-of-core processing.
+
+    Args:
+        store: Root directory of the dataset
+        columns: Columns to read (default: all)
+        batch_size: Maximum rows per batch
+        **filters: Keyword arguments for ``build_filter``
+
+    Yields:
+        Record batches with the matching rows
+    """
+    scanner = open_dataset(store).scanner(
+        columns=columns, filter=build_filter(**filters), batch_size=batch_size
+    )
+    yield from scanner.to_batches()
+
+
+def aggregate(
+    store: str = DEFAULT_STORE,
+    by: Sequence[str] = ("PROVINCE", "month"),
+    metrics: Sequence[str] = (
+        "mth_unit_recieved_dummy",
+        "mth_unit_billed_dummy",
+        "assessment_dummy",
+        "payment_dummy",
+    ),
+    **filters,
+) -> pa.Table:
+    """
+    Sum metrics by group, streaming over the dataset.
+
+    Each batch is reduced to partial sums which are combined at the end, so
+    only one batch plus the (small) group table is held in memory.
+
+    Args:
+        store: Root directory of the dataset
+        by: Grouping columns
+        metrics: Columns to sum
+        **filters: Keyword arguments for ``build_filter``
+
+    Returns:
+        Arrow table of group keys, summed metrics and a row ``count``
+    """
+    by, metrics = list(by), list(metrics)
+    partials = []
+    for batch in scan_batches(store, columns=by + metrics, **filters):
+        table = pa.Table.from_batches([batch])
+        table = table.append_column("count", pa.array([1] * table.num_rows, pa.int64()))
+        partials.append(_group_sums(table, by, metrics + ["count"]))
+        # Fold partials periodically to keep memory flat
+        if len(partials) >= 64:
+            partials = [_group_sums(pa.concat_tables(partials), by, metrics + ["count"])]
+
+    if not partials:
+        return pa.table({name: [] for name in by + metrics + ["count"]})
+    result = _group_sums(pa.concat_tables(partials), by, metrics + ["count"])
+    return result.sort_by([(name, "ascending") for name in by])
+
+
+def _group_sums(table: pa.Table, by: List[str], columns: List[str]) -> pa.Table:
+    """Sum ``columns`` grouped by ``by``, keeping the original column names."""
+    grouped = table.group_by(by).aggregate([(name, "sum") for name in columns])
+    return grouped.select(by + [f"{name}_sum" for name in columns]).rename_columns(by + columns)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Convert and query the partitioned UC monthly dataset"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="Convert a UC monthly CSV")
+    convert_parser.add_argument("csv_path", help="Path to the UC monthly CSV")
+    convert_parser.add_argument("--store", default=DEFAULT_STORE,
+                                help=f"Dataset directory (default: {DEFAULT_STORE})")
+
+    query_parser = subparsers.add_parser("query", help="Query a slice of the dataset")
+    query_parser.add_argument("--store", default=DEFAULT_STORE,
+                              help=f"Dataset directory (default: {DEFAULT_STORE})")
+    query_parser.add_argument("--province", action="append", default=None,
+                              help="Province to keep (repeatable)")
+    query_parser.add_argument("--start-month", default=None, help="First month (YYYY-MM)")
+    query_parser.add_argument("--end-month", default=None, help="Last month (YYYY-MM)")
+    query_parser.add_argument("--columns", default=None,
+                              help="Comma-separated columns to read")
+    query_parser.add_argument("--aggregate", action="store_true",
+                              help="Sum volumes by PROVINCE and month instead of listing rows")
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "convert":
+        print(f"Converting {args.csv_path} -> {args.store}...")
+        rows = convert_csv(args.csv_path, args.store)
+        print(f"✅ Wrote {rows} rows in {time.perf_counter() - start:.2f}s")
+        print("Run ingest_uc_month.py --rebuild to refresh running aggregates")
+        return
+
+    filters = {
+        "provinces": args.province,
+        "start_month": args.start_month,
+        "end_month": args.end_month,
+    }
+    if args.aggregate:
+        result = aggregate(args.store, **filters)
+    else:
+        columns = args.columns.split(",") if args.columns else None
+        result = query(args.store, columns=columns, **filters)
+    elapsed = time.perf_counter() - start
+
+    print(result.to_pandas().to_string(max_rows=20))
+    print(f"\n{result.num_rows} rows in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Single-pass vectorized validator for the feeder and UC monthly datasets.
+
+Rules are declared as data: each one is either a pandas expression that must
+hold for every row, a regular expression a column must match, or a set of
+columns that must be unique. Files are read in chunks and every rule is
+evaluated as a column expression over each chunk, so one pass over the file
+checks all rules and reports violating row numbers (0-based data rows).
+"""
+
+import argparse
+import sys
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+# Rough bounding box of Pakistan
+LAT_RANGE = (23.5, 37.1)
+LON_RANGE = (60.8, 77.9)
+
+FEEDER_PERCENT_COLUMNS = [
+    "td_loss_percent",
+    "technical_loss_percent",
+    "non_technical_loss_percent",
+    "recovery_percent",
+]
+
+FEEDER_RULES = [
+    {
+        "name": "loss_components_sum",
+        "description": "technical + non-technical loss equals T&D loss (±0.5 pt)",
+        "expr": "abs(technical_loss_percent + non_technical_loss_percent - td_loss_percent) <= 0.5",
+    },
+    *[
+        {
+            "name": f"{col}_range",
+            "description": f"{col} within [0, 100]",
+            "expr": f"({col} >= 0) & ({col} <= 100)",
+        }
+        for col in FEEDER_PERCENT_COLUMNS
+    ],
+    {
+        "name": "lat_in_pakistan",
+        "description": f"lat within {LAT_RANGE}",
+        "expr": f"(lat >= {LAT_RANGE[0]}) & (lat <= {LAT_RANGE[1]})",
+    },
+    {
+        "name": "lon_in_pakistan",
+        "description": f"lon within {LON_RANGE}",
+        "expr": f"(lon >= {LON_RANGE[0]}) & (lon <= {LON_RANGE[1]})",
+    },
+    {
+        "name": "consumers_positive",
+        "description": "consumers > 0",
+        "expr": "consumers > 0",
+    },
+    {
+        "name": "circuit_length_positive",
+        "description": "circuit_length_km > 0",
+        "expr": "circuit_length_km > 0",
+    },
+    {
+        "name": "feeder_id_unique",
+        "description": "feeder_id is unique",
+        "unique": ["feeder_id"],
+    },
+]
+
+UC_VOLUME_COLUMNS = [
+    "mth_unit_recieved_dummy",
+    "mth_unit_billed_dummy",
+    "assessment_dummy",
+    "payment_dummy",
+]
+
+UC_RULES = [
+    {
+        "name": "month_format",
+        "description": "month is a YY-Mon label",
+        "column": "month",
+        "pattern": r"^\d{2}-(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)$",
+    },
+    *[
+        {
+            "name": f"{col}_non_negative",
+            "description": f"{col} >= 0",
+            "expr": f"{col} >= 0",
+        }
+        for col in UC_VOLUME_COLUMNS
+    ],
+    {
+        "name": "td_loss_consistent",
+        "description": "td_loss_dummy equals (received - billed) / received",
+        "optional_columns": ["td_loss_dummy"],
+        "expr": "(mth_unit_recieved_dummy <= 0) | (abs(td_loss_dummy * mth_unit_recieved_dummy"
+                " - (mth_unit_recieved_dummy - mth_unit_billed_dummy)) <= 1e-6 * mth_unit_recieved_dummy + 1)",
+    },
+    {
+        "name": "recovery_loss_consistent",
+        "description": "recovery_loss_dummy equals (assessment - payment) / assessment",
+        "optional_columns": ["recovery_loss_dummy"],
+        "expr": "(assessment_dummy <= 0) | (abs(recovery_loss_dummy * assessment_dummy"
+                " - (assessment_dummy - payment_dummy)) <= 1e-6 * assessment_dummy + 1)",
+    },
+    {
+        "name": "td_loss_at_most_one",
+        "description": "td_loss_dummy <= 1",
+        "optional_columns": ["td_loss_dummy"],
+        "expr": "td_loss_dummy <= 1",
+    },
+    {
+        "name": "month_uc_unique",
+        "description": "one row per (month, uc)",
+        "unique": ["month", "uc"],
+    },
+]
+
+RULE_SETS = {
+    "feeder": FEEDER_RULES,
+    "uc": UC_RULES,
+}
+
+
+def applicable_rules(rules: List[Dict[str, Any]], available) -> List[Dict[str, Any]]:
+    """
+    Drop rules whose ``optional_columns`` are not all present.
+
+    Derived columns such as the UC loss rates may be omitted from an extract
+    (ingest recomputes them); their rules only apply when they are supplied.
+
+    Args:
+        rules: Rule definitions
+        available: Columns present in the data
+
+    Returns:
+        Rules that can be evaluated
+    """
+    available = set(available)
+    return [rule for rule in rules if available.issuperset(rule.get("optional_columns", []))]
+
+
+def rule_columns(rules: List[Dict[str, Any]], available: List[str]) -> List[str]:
+    """
+    Columns a rule set needs, so chunked reads can skip the rest.
+
+    Args:
+        rules: Rule definitions
+        available: Columns present in the file
+
+    Returns:
+        List of column names referenced by the rules
+    """
+    needed = set()
+    for rule in rules:
+        if "unique" in rule:
+            needed.update(rule["unique"])
+        elif "pattern" in rule:
+            needed.add(rule["column"])
+        else:
+            needed.update(col for col in available if col in rule["expr"])
+    return [col for col in available if col in needed]
+
+
+def evaluate_chunk(chunk: pd.DataFrame, rules: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Evaluate row-level rules on one chunk.
+
+    Uniqueness rules are skipped here; they need the whole file and are
+    resolved by ``validate_file`` from hashed keys.
+
+    Args:
+        chunk: DataFrame chunk
+        rules: Rule definitions
+
+    Returns:
+        Dictionary mapping rule name to chunk-relative violating row positions
+    """
+    violations = {}
+    for rule in rules:
+        if "unique" in rule:
+            continue
+        try:
+            if "pattern" in rule:
+                valid = chunk[rule["column"]].astype(str).str.match(rule["pattern"]).to_numpy()
+            else:
+                valid = chunk.eval(rule["expr"]).to_numpy(dtype=bool)
+        except (KeyError, pd.errors.UndefinedVariableError) as e:
+            raise ValueError(f"Rule '{rule['name']}' references a missing column: {e}") from e
+        violations[rule["name"]] = np.flatnonzero(~valid)
+    return violations
+
+
+def validate_frame(df: pd.DataFrame, rules: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Validate an in-memory DataFrame against a rule set.
+
+    Args:
+        df: DataFrame to validate
+        rules: Rule definitions
+
+    Returns:
+        Dictionary mapping rule name to violating row positions (rules
+        skipped for missing optional columns are absent)
+    """
+    rules = applicable_rules(rules, df.columns)
+    violations = evaluate_chunk(df, rules)
+    for rule in rules:
+        if "unique" in rule:
+            duplicated = df.duplicated(subset=rule["unique"], keep="first").to_numpy()
+            violations[rule["name"]] = np.flatnonzero(duplicated)
+    return violations
+
+
+def validate_file(
+    path: str, rules: List[Dict[str, Any]], chunksize: int = 1_000_000
+) -> Dict[str, np.ndarray]:
+    """
+    Validate a CSV file against a rule set in a single chunked pass.
+
+    Args:
+        path: Path to the CSV file
+        rules: Rule definitions
+        chunksize: Rows per chunk
+
+    Returns:
+        Dictionary mapping rule name to violating row numbers (rules
+        skipped for missing optional columns are absent)
+    """
+    header = pd.read_csv(path, nrows=0).columns.tolist()
+    rules = applicable_rules(rules, header)
+    usecols = rule_columns(rules, header)
+
+    found = {rule["name"]: [] for rule in rules}
+    unique_rules = [rule for rule in rules if "unique" in rule]
+    key_hashes = {rule["name"]: [] for rule in unique_rules}
+
+    offset = 0
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize):
+        for name, rows in evaluate_chunk(chunk, rules).items():
+            found[name].append(rows + offset)
+        for rule in unique_rules:
+            hashes = pd.util.hash_pandas_object(chunk[rule["unique"]], index=False)
+            key_hashes[rule["name"]].append(hashes.to_numpy())
+        offset += len(chunk)
+
+    # Duplicates: every occurrence after the first of a repeated key hash
+    for rule in unique_rules:
+        hashes = np.concatenate(key_hashes[rule["name"]]) if offset else np.empty(0, np.uint64)
+        _, first = np.unique(hashes, return_index=True)
+        is_first = np.zeros(len(hashes), dtype=bool)
+        is_first[first] = True
+        found[rule["name"]].append(np.flatnonzero(~is_first))
+
+    return {
+        name: np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        for name, rows in found.items()
+    }
+
+
+def detect_rule_set(path: str) -> str:
+    """Pick the rule set matching a file's header."""
+    header = pd.read_csv(path, nrows=0).columns
+    return "feeder" if "feeder_id" in header else "uc"
+
+
+def print_report(path: str, rules: List[Dict[str, Any]], violations: Dict[str, np.ndarray], show: int = 10):
+    """Print a per-rule violation summary."""
+    print(f"\nValidation report for {path}")
+    print("=" * 60)
+    for rule in rules:
+        if rule["name"] not in violations:
+            print(f"- {rule['name']}: skipped (optional columns not present) — {rule['description']}")
+            continue
+        rows = violations[rule["name"]]
+        status = "✓" if len(rows) == 0 else "✗"
+        print(f"{status} {rule['name']}: {len(rows)} violations — {rule['description']}")
+        if len(rows):
+            more = f" ... (+{len(rows) - show})" if len(rows) > show else ""
+            print(f"    rows: {rows[:show].tolist()}{more}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Validate feeder and UC monthly CSVs against declarative rules"
+    )
+    parser.add_argument("files", nargs="+", help="CSV files to validate")
+    parser.add_argument(
+        "--rules",
+        choices=sorted(RULE_SETS),
+        default=None,
+        help="Rule set to apply (default: detect from the header)",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=1_000_000,
+        help="Rows per chunk (default: 1000000)",
+    )
+    parser.add_argument(
+        "--violations-csv",
+        type=str,
+        default=None,
+        help="Optional CSV listing every (file, rule, row) violation",
+    )
+    args = parser.parse_args()
+
+    failed = False
+    records = []
+    for path in args.files:
+        rules = RULE_SETS[args.rules or detect_rule_set(path)]
+        violations = validate_file(path, rules, chunksize=args.chunksize)
+        print_report(path, rules, violations)
+        for name, rows in violations.items():
+            failed = failed or len(rows) > 0
+            if args.violations_csv:
+                records.append(pd.DataFrame({"file": path, "rule": name, "row": rows}))
+
+    if args.violations_csv and records:
+        pd.concat(records, ignore_index=True).to_csv(args.violations_csv, index=False)
+        print(f"\nSaved violations to {args.violations_csv}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()